@@ -9,11 +9,15 @@ from src.infrastructure.google_sheets_service import GoogleSheetsService
 from src.infrastructure.transaction_sheet_service import TransactionSheetService
 from src.infrastructure.whatsapp_service import WhatsAppService
 from src.infrastructure.gemini_text_agent import GeminiTextAgent
-from src.infrastructure.xlsx_parser import XLSXParser
+from src.infrastructure.upload_parser import UploadParser
 from src.infrastructure.email_service import EmailService
+from src.infrastructure.email_dispatcher import EmailDispatcher
 from src.infrastructure.whatsapp_service import WhatsAppService
 from src.infrastructure.whatsapp_messages_queue import WhatsappMessagesQueue
+from src.infrastructure.delivery_status_buffer import DeliveryStatusBuffer
 from src.infrastructure.transaction_sheet_tools import TransactionSheetTools
+from src.infrastructure.job_queue import JobQueue
+from src.infrastructure.file_hash_index import FileHashIndex
 
 # Application
 from src.application.file_processor_handler import create_file_processor_blueprint
@@ -30,15 +34,44 @@ class APIHandler:
         folder_uploaded_transactions_id = os.getenv('GOOGLE_UPLOADED_TRANSACTIONS_FOLDER_ID')
         service_account_file = './env/service_account_gmail-agent.json'
         user_email = os.getenv('USER_EMAIL') 
+        # Optional local SQLite mirror of the transactions spreadsheet
+        transactions_mirror_path = os.getenv('TRANSACTIONS_MIRROR_PATH')
+        # Outbound WhatsApp messages not sent yet, replayed after a restart
+        whatsapp_outbox_path = os.getenv('WHATSAPP_OUTBOX_PATH', './env/whatsapp_outbox.db')
+        # Content hashes of the uploaded files already processed
+        processed_files_index_path = os.getenv('PROCESSED_FILES_INDEX_PATH', './env/processed_files_index.json')
 
         # Initialize Services
         self.whatsapp_service = WhatsAppService()
-        self.file_parser = XLSXParser()
-        self.transaction_sheet_service = TransactionSheetService(service_account_file, sheet_id)
+        self.file_parser = UploadParser()
+        self.transaction_sheet_service = TransactionSheetService(
+            service_account_file,
+            sheet_id,
+            mirror_path=transactions_mirror_path
+        )
         self.google_drive_service = GoogleDriveService(service_account_file, folder_uploaded_transactions_id)
         self.email_service = EmailService(service_account_file, user_email)
+        # Concurrent sends for uploaded transactions, within the Gmail rate limit
+        self.email_dispatcher = EmailDispatcher(
+            self.email_service,
+            max_workers=int(os.getenv('GMAIL_SEND_WORKERS', EmailDispatcher.MAX_WORKERS)),
+            rate_limit=float(os.getenv('GMAIL_SEND_RATE_LIMIT', EmailDispatcher.RATE_LIMIT))
+        )
         self.whatsapp_service = WhatsAppService()
-        self.whatsapp_messages_queue = WhatsappMessagesQueue(self.whatsapp_service)
+        # Delivery outcomes of the messages, written to the transactions in batches
+        self.whatsapp_delivery_statuses = DeliveryStatusBuffer(self.transaction_sheet_service)
+        # Concurrent sends of queued messages, within the provider rate limits
+        self.whatsapp_messages_queue = WhatsappMessagesQueue(
+            self.whatsapp_service,
+            workers=int(os.getenv('WHATSAPP_SEND_WORKERS', WhatsappMessagesQueue.WORKERS)),
+            rate_per_second=float(os.getenv('WHATSAPP_RATE_PER_SECOND', WhatsappMessagesQueue.RATE_PER_SECOND)),
+            rate_per_minute=float(os.getenv('WHATSAPP_RATE_PER_MINUTE', WhatsappMessagesQueue.RATE_PER_MINUTE)),
+            outbox_path=whatsapp_outbox_path,
+            on_delivery=self.whatsapp_delivery_statuses.record
+        )
+        # Uploaded files are processed one at a time on a background worker
+        self.file_processing_jobs = JobQueue()
+        self.processed_files_index = FileHashIndex(processed_files_index_path)
 
         # Initialize Tools
         self.transaction_sheet_tools = TransactionSheetTools(self.transaction_sheet_service)
@@ -55,8 +88,10 @@ class APIHandler:
             self.file_parser, 
             self.transaction_sheet_service, 
             self.google_drive_service,
-            self.email_service,
-            self.whatsapp_messages_queue
+            self.email_dispatcher,
+            self.whatsapp_messages_queue,
+            self.file_processing_jobs,
+            self.processed_files_index
         ))
     
     def run(self, host: str = '127.0.0.1', port: int = 5001):
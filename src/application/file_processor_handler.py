@@ -1,20 +1,31 @@
 from datetime import datetime
-import io
+import os
+import tempfile
+import zipfile
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import string
+import secrets
 from flask import Blueprint, request, jsonify
 import pandas as pd
-import secrets
-import string
+import numpy as np
 
 from src.infrastructure.worksheets.states_worksheet import StatesWorksheet
+from src.infrastructure.file_view import FileView
+
+ID_ALPHABET = np.frombuffer((string.ascii_letters + string.digits).encode(), dtype=np.uint8)
+ID_PART_LENGTH = 6
+# Random bytes at or above this bound are discarded so every character is equally likely
+ID_BYTE_BOUND = 256 - 256 % len(ID_ALPHABET)
+
+# Processes parsing the files of a batch upload in parallel
+BATCH_PARSE_WORKERS = min(4, os.cpu_count() or 1)
+# Entry present in every xlsx package, which tells workbooks apart from zip archives
+XLSX_CONTENT_TYPES = '[Content_Types].xml'
 
-def generate_secure_unique_id():
-    chars = string.ascii_letters + string.digits
-    part1 = ''.join(secrets.choice(chars) for _ in range(6))
-    part2 = ''.join(secrets.choice(chars) for _ in range(6))
-    return f"{part1}-{part2}"
+EMAIL_SUBJECT_TEMPLATE = "Transactions Pending Due to Missing Documents - {movement_number}"
 
-def default_email_message(movement_number, reference, email_id):
-    return f"""Dear client, 
+EMAIL_MESSAGE_TEMPLATE = """Dear client, 
 
 we inform you that the transaction N°{movement_number} with reference {reference} is pending due to missing documentation.
 Please be so kind as to reply to this message by attaching a copy of your personal ID.
@@ -23,8 +34,7 @@ Best regards, Simetrik team
 remediation-id@[{email_id}]
 """
 
-def default_whatsapp_message(movement_number, reference, wp_id):
-    return f"""Dear client, 
+WHATSAPP_MESSAGE_TEMPLATE = """Dear client, 
 
 we inform you that the transaction N°{movement_number} with reference {reference}  is pending a reimbursement.
 Please be so kind as to reply to this email by attaching a copy of reimbursement confirmation
@@ -32,9 +42,278 @@ Please be so kind as to reply to this email by attaching a copy of reimbursement
 Best regards, Simetrik team
 remediation-id@[{wp_id}]
 """
-def create_file_processor_blueprint(file_parser, transaction_service, google_drive_service, email_service, whatsapp_messages_queue):
+
+def generate_secure_unique_ids(count):
+    """Generate count IDs like 'aB3dE9-Xy7zQ2' from a single draw of random bytes"""
+    needed = count * 2 * ID_PART_LENGTH
+    # Draw a margin for the rejected bytes; a second draw is only needed in the rare case it falls short
+    draw = np.frombuffer(secrets.token_bytes(needed + needed // 16 + 16), dtype=np.uint8)
+    accepted = draw[draw < ID_BYTE_BOUND]
+    while len(accepted) < needed:
+        extra = np.frombuffer(secrets.token_bytes(needed), dtype=np.uint8)
+        accepted = np.concatenate([accepted, extra[extra < ID_BYTE_BOUND]])
+
+    chars = ID_ALPHABET[accepted[:needed] % len(ID_ALPHABET)].reshape(count, 2, ID_PART_LENGTH)
+    dashes = np.full((count, 1), ord('-'), dtype=np.uint8)
+    ids = np.hstack([chars[:, 0], dashes, chars[:, 1]])
+    return ids.view(f'S{2 * ID_PART_LENGTH + 1}').ravel().astype(str)
+
+def render_messages(template, **columns):
+    """Render a str.format template for whole columns at once, as a string Series"""
+    index = next(iter(columns.values())).index
+    rendered = pd.Series("", index=index, dtype='string')
+    for literal, field, _, _ in string.Formatter().parse(template):
+        rendered = rendered + literal
+        if field is not None:
+            rendered = rendered + columns[field].astype('string').fillna('')
+    return rendered
+
+def create_file_processor_blueprint(file_parser, transaction_service, google_drive_service, email_dispatcher, whatsapp_messages_queue, job_queue, file_hash_index):
     blueprint = Blueprint('file_processor_api', __name__)
 
+    # Progress counters reported by /jobs/<job_id>
+    JOB_COUNTERS = {
+        "rows_parsed": 0,
+        "duplicates_skipped": 0,
+        "total_new_transactions": 0,
+        "protocol_2b_count": 0,
+        "protocol_3c_count": 0,
+        "no_procesado_count": 0,
+        "emails_sent": 0,
+        "whatsapp_messages_queued": 0,
+        "rows_dropped": 0,
+        "save_status": "pending",
+        "archive_status": "uploading",
+    }
+
+    # Uploads are archived to Drive one at a time, while their jobs run
+    archive_executor = ThreadPoolExecutor(max_workers=1)
+
+    def archive_file(file_view, filename):
+        """Upload a read-only view of a spooled upload to Drive"""
+        DATE_FORMAT = '%Y-%m-%d_%H-%M-%S'
+        try:
+            file_name = f"{datetime.now().strftime(DATE_FORMAT)}_{filename}"
+            return google_drive_service.upload_file(file_name, file_view)
+        finally:
+            file_view.close()
+
+    def submit_archive(file_view, filename):
+        """Start archiving a view of a spooled upload; the view is also closed if the archive is cancelled"""
+        archive = archive_executor.submit(archive_file, file_view, filename)
+        archive.add_done_callback(lambda future: file_view.close() if future.cancelled() else None)
+        return archive
+
+    def process_transactions(new_transactions_df, job):
+        """Route new transactions to their protocol, notify the clients and add them to the worksheet"""
+        # Split transactions based on QUERY value
+        protocol_2b_df = new_transactions_df[new_transactions_df['QUERY'] == "2"].copy()
+        protocol_3c_df = new_transactions_df[new_transactions_df['QUERY'] == "3"].copy()
+        no_procesado_df = new_transactions_df[
+            ~new_transactions_df['QUERY'].isin(["2", "3"])
+        ].copy()
+
+        # Add state to each DataFrame
+        protocol_2b_df['ESTADO DE REMEDIACION'] = StatesWorksheet.EN_PROCESO
+        protocol_3c_df['ESTADO DE REMEDIACION'] = StatesWorksheet.EN_PROCESO
+        no_procesado_df['ESTADO DE REMEDIACION'] = StatesWorksheet.NO_PROCESADO
+
+        # Prepare the ids and messages of the contactable rows in bulk
+        emails_df = protocol_2b_df[protocol_2b_df['CORREO'].notna()]
+        email_ids = pd.Series(generate_secure_unique_ids(len(emails_df)), index=emails_df.index, dtype='string')
+        subjects = render_messages(EMAIL_SUBJECT_TEMPLATE, movement_number=emails_df['N° Movimiento'])
+        email_messages = render_messages(
+            EMAIL_MESSAGE_TEMPLATE,
+            movement_number=emails_df['N° Movimiento'],
+            reference=emails_df['Referencia'],
+            email_id=email_ids
+        )
+
+        # Send emails for protocol 2b transactions concurrently, within the Gmail rate limit
+        def on_email_result(index, error):
+            job.increment("emails_sent" if error is None else "rows_dropped")
+
+        email_errors = email_dispatcher.send_many(
+            list(zip(emails_df.index, emails_df['CORREO'], subjects, email_messages)),
+            on_result=on_email_result
+        )
+        failed_emails = pd.Series(
+            [email_errors[index] is not None for index in emails_df.index], index=emails_df.index, dtype=bool
+        )
+        for index in failed_emails.index[failed_emails]:
+            print(f"Error sending email to {emails_df.at[index, 'CORREO']} from {email_dispatcher.email_service.user_email}: {str(email_errors[index])}")
+        sent_emails = failed_emails.index[~failed_emails]
+        protocol_2b_df.loc[sent_emails, 'EMAIL ID'] = email_ids[sent_emails]
+        # Record the sent emails in the email history as one batch
+        transaction_service.email_history.add_messages(list(zip(
+            email_ids[sent_emails], email_messages[sent_emails], emails_df.loc[sent_emails, 'N° Movimiento']
+        )))
+        protocol_2b_index_to_drop = failed_emails.index[failed_emails]
+        protocol_2b_df = protocol_2b_df.drop(protocol_2b_index_to_drop)
+
+        # Send whatsapp messages for protocol 3c transactions
+        whatsapp_df = protocol_3c_df[protocol_3c_df['TELEFONO'].notna()]
+        wp_ids = pd.Series(generate_secure_unique_ids(len(whatsapp_df)), index=whatsapp_df.index, dtype='string')
+        whatsapp_messages = render_messages(
+            WHATSAPP_MESSAGE_TEMPLATE,
+            movement_number=whatsapp_df['N° Movimiento'],
+            reference=whatsapp_df['Referencia'],
+            wp_id=wp_ids
+        )
+        # The messages are stored in the durable outbox as one batch
+        try:
+            whatsapp_messages_queue.put_messages(list(zip(whatsapp_df['TELEFONO'], whatsapp_messages, wp_ids)))
+            queued = pd.Series(True, index=whatsapp_df.index, dtype=bool)
+        except Exception as e:
+            queued = pd.Series(False, index=whatsapp_df.index, dtype=bool)
+            print(f"Error queueing {len(whatsapp_df)} whatsapp messages: {str(e)}")
+        job.increment("whatsapp_messages_queued", int(queued.sum()))
+        job.increment("rows_dropped", int((~queued).sum()))
+        protocol_3c_df.loc[queued.index[queued], 'WP ID'] = wp_ids[queued]
+        # Record the queued messages in the WhatsApp history as one batch
+        queued_index = queued.index[queued]
+        transaction_service.whatsapp_history.add_messages(list(zip(
+            wp_ids[queued_index], whatsapp_messages[queued_index], whatsapp_df.loc[queued_index, 'N° Movimiento']
+        )))
+        protocol_3c_index_to_drop = queued.index[~queued]
+        protocol_3c_df = protocol_3c_df.drop(protocol_3c_index_to_drop)
+
+        # Add transactions to the worksheet as one batch
+        transaction_service.transactions.add_dataframe(
+            pd.concat([protocol_2b_df, protocol_3c_df, no_procesado_df])
+        )
+
+        job.increment("total_new_transactions", len(new_transactions_df))
+        job.increment("protocol_2b_count", len(protocol_2b_df))
+        job.increment("protocol_3c_count", len(protocol_3c_df))
+        job.increment("no_procesado_count", len(no_procesado_df))
+
+        return len(protocol_2b_index_to_drop), len(protocol_3c_index_to_drop)
+
+    def remove_known_transactions(new_transactions_df, upload_movements, job):
+        """
+        Remove transactions already ingested or repeated earlier in the upload,
+        returning the new transactions and the extended movement numbers of the upload
+        """
+        movements = new_transactions_df['N° Movimiento']
+        is_known = transaction_service.movement_keys.contains(movements) | movements.isin(upload_movements).to_numpy()
+        is_new = ~is_known & ~(movements.duplicated() & movements.notna()).to_numpy()
+        job.increment("duplicates_skipped", int((~is_new).sum()))
+        new_transactions_df = new_transactions_df[is_new]
+        upload_movements = np.concatenate([
+            upload_movements,
+            new_transactions_df['N° Movimiento'].dropna().to_numpy('int64')
+        ])
+        return new_transactions_df, upload_movements
+
+    def build_summary(progress, protocol_2b_dropped, protocol_3c_dropped):
+        return {
+            "total_new_transactions": progress["total_new_transactions"],
+            "protocol_2b_count": progress["protocol_2b_count"],
+            "protocol_2b_dropped": protocol_2b_dropped,
+            "protocol_3c_count": progress["protocol_3c_count"],
+            "protocol_3c_dropped": protocol_3c_dropped,
+            "no_procesado_count": progress["no_procesado_count"],
+        }
+
+    def process_file(job, file_stream, archive, file_hash, filename):
+        """Run the upload pipeline for a spooled file on a job worker, while archive uploads it"""
+        # The parser reads its own view, so it never moves the position the
+        # archival upload reads from
+        file_view = FileView(file_stream)
+        try:
+            # An identical upload may have been processed while this one was queued
+            processed = file_hash_index.get(file_hash)
+            if processed is not None:
+                job.set("save_status", "already processed")
+                # The first upload was archived, so this one is skipped unless
+                # its archival upload already started
+                if archive.cancel():
+                    job.set("archive_status", "skipped")
+                else:
+                    wait_for_archive(job, archive)
+                return already_processed_response(processed, file_hash)
+
+            # Catch up with changes made to the sheet by others before appending
+            # to it; when the transactions are downloaded again, the movement
+            # key set is rebuilt from them. After our own saves this is only a
+            # modified time check.
+            transaction_service.reload_all_data()
+            # Movement numbers of the file, until they are saved to the key set
+            upload_movements = np.empty(0, dtype='int64')
+
+            protocol_2b_dropped = 0
+            protocol_3c_dropped = 0
+
+            # Parse, dedup, route and persist the upload chunk by chunk
+            for new_transactions_df in file_parser.iter_chunks(file_view, schema=transaction_service.SCHEMA):
+                job.increment("rows_parsed", len(new_transactions_df))
+
+                # Remove transactions that already exist or repeat within the file
+                new_transactions_df, upload_movements = remove_known_transactions(new_transactions_df, upload_movements, job)
+                if new_transactions_df.empty:
+                    continue
+
+                dropped_2b, dropped_3c = process_transactions(new_transactions_df, job)
+                protocol_2b_dropped += dropped_2b
+                protocol_3c_dropped += dropped_3c
+
+                # Save the chunk, coalesced with other pending saves
+                transaction_service.schedule_save()
+                job.set("save_status", "scheduled")
+
+            progress = job.to_dict()['progress']
+            if progress["total_new_transactions"] == 0:
+                job.set("save_status", "nothing to save")
+                file_id = wait_for_archive(job, archive)
+                file_hash_index.add(file_hash, filename, {"total_new_transactions": 0}, file_id)
+                return {"response": "No new transactions to process", "file_id": file_id}
+
+            # The job is only reported as done once its rows are persisted
+            saved = transaction_service.flush()
+            job.set("save_status", "saved" if saved else "failed")
+
+            # Join the archival upload, which ran alongside the processing
+            file_id = wait_for_archive(job, archive)
+
+            summary = build_summary(progress, protocol_2b_dropped, protocol_3c_dropped)
+            # Only files whose rows were persisted are skipped when uploaded again
+            if saved:
+                file_hash_index.add(file_hash, filename, summary, file_id)
+
+            return {
+                "response": "Processing completed",
+                "summary": summary,
+                "file_id": file_id
+            }
+        finally:
+            # The archival upload must be done with the file before it is deleted
+            if not archive.cancelled():
+                archive.exception()
+            file_view.close()
+            file_stream.close()
+
+    def already_processed_response(processed, file_hash):
+        return {
+            "response": "File already processed",
+            "file_hash": file_hash,
+            "processed_at": processed["processed_at"],
+            "summary": processed["summary"],
+            "file_id": processed["file_id"]
+        }
+
+    def wait_for_archive(job, archive):
+        """Wait for the archival upload and record its outcome"""
+        file_id = archive.result()
+        job.set("archive_status", "archived" if file_id else "failed")
+        return file_id
+
+    def spool_file(source, file_stream):
+        """Copy a stream into a temporary file in blocks, returning the file and its content hash"""
+        file_hash = file_hash_index.hash_file(source, copy_to=file_stream)
+        file_stream.flush()
+        return file_stream, file_hash
+
     @blueprint.route('/file_processor_api', methods=['POST'])
     def file_processor_api():
         if 'file' not in request.files:
@@ -46,98 +325,236 @@ def create_file_processor_blueprint(file_parser, transaction_service, google_dri
             return jsonify({'error': 'No selected file'}), 400
 
         try:
-            DATE_FORMAT = '%Y-%m-%d_%H-%M-%S'
-            # Read file content into memory
-            file_stream = io.BytesIO(file.read())
-            
-            # Parse the uploaded file
-            new_transactions_df = file_parser.read_file(file_stream, converters=transaction_service.CONVERTERS)
-            
-            # Get existing transactions
+            # Copy the upload to a temporary file that outlives the request,
+            # without holding it in memory, hashing it on the way
+            file_stream, file_hash = spool_file(file.stream, tempfile.TemporaryFile())
+            if file_stream.tell() == 0:
+                file_stream.close()
+                return jsonify({'error': 'The uploaded file is empty'}), 400
+
+            # Identical files are answered with the result of their first upload
+            processed = file_hash_index.get(file_hash)
+            if processed is not None:
+                file_stream.close()
+                return jsonify(already_processed_response(processed, file_hash))
+
+            # Start archiving right away from a view of the file, without
+            # copying it, while the job waits for a worker and runs
+            archive = submit_archive(FileView(file_stream), file.filename)
+
+            job_id = job_queue.submit(process_file, file_stream, archive, file_hash, file.filename, counters=JOB_COUNTERS)
+
+            return jsonify({
+                "response": "Processing started",
+                "job_id": job_id,
+                "status_url": f"/jobs/{job_id}"
+            }), 202
+
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    # Parsing processes are started with the first batch upload. They are
+    # spawned rather than forked, as the server runs several threads
+    parse_executor = None
+
+    def get_parse_executor():
+        nonlocal parse_executor
+        if parse_executor is None:
+            parse_executor = ProcessPoolExecutor(
+                max_workers=BATCH_PARSE_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return parse_executor
+
+    def spool_data_files(file, file_stream, file_hash):
+        """
+        Get the (path, hash, name) of the data files of a spooled batch file:
+        the file itself, or each workbook or delimited text file inside it when
+        it's a zip archive
+        """
+        file_stream.seek(0)
+        if not zipfile.is_zipfile(file_stream):
+            return [(file_stream.name, file_hash, file.filename)]
+        with zipfile.ZipFile(file_stream) as archive:
+            names = archive.namelist()
+            if XLSX_CONTENT_TYPES in names:
+                return [(file_stream.name, file_hash, file.filename)]
+
+            data_files = []
+            for info in archive.infolist():
+                member_name = os.path.basename(info.filename)
+                if info.is_dir() or info.filename.startswith('__MACOSX/') or member_name.startswith('.'):
+                    continue
+                extension = os.path.splitext(member_name)[1].lower()
+                if extension not in file_parser.EXTENSIONS:
+                    continue
+                with archive.open(info) as member, tempfile.NamedTemporaryFile(suffix=extension, delete=False) as member_stream:
+                    _, member_hash = spool_file(member, member_stream)
+                data_files.append((member_stream.name, member_hash, f"{file.filename}/{info.filename}"))
+            return data_files
+
+    def process_batch(job, uploads):
+        """
+        Run the upload pipeline for several spooled files on a job worker: their
+        files are parsed in parallel and deduplicated together, with one
+        reload of the worksheets and one save
+        """
+        try:
+            data_files = []
+            for upload in uploads:
+                for path, file_hash, name in upload["data_files"]:
+                    # An identical file may have been processed while this batch was queued
+                    if file_hash_index.get(file_hash) is None:
+                        data_files.append((path, file_hash, name, upload["archive"]))
+                    else:
+                        job.increment("files_skipped")
+
             transaction_service.reload_all_data()
-            existing_transactions_df = transaction_service.transactions.read_all()
-            
-            # Remove transactions that already exist
-            if not existing_transactions_df.empty:
-                new_transactions_df = new_transactions_df[
-                    ~new_transactions_df['N° Movimiento'].isin(existing_transactions_df['N° Movimiento'])
-                ]
-
-            if new_transactions_df.empty:
-                return jsonify({"response": "No new transactions to process"})
-
-            # Split transactions based on QUERY value
-            protocol_2b_df = new_transactions_df[new_transactions_df['QUERY'] == "2"].copy()
-            protocol_3c_df = new_transactions_df[new_transactions_df['QUERY'] == "3"].copy()
-            no_procesado_df = new_transactions_df[
-                ~new_transactions_df['QUERY'].isin(["2", "3"])
-            ].copy()
-
-            # Add state to each DataFrame
-            protocol_2b_df['ESTADO DE REMEDIACION'] = StatesWorksheet.EN_PROCESO
-            protocol_3c_df['ESTADO DE REMEDIACION'] = StatesWorksheet.EN_PROCESO
-            no_procesado_df['ESTADO DE REMEDIACION'] = StatesWorksheet.NO_PROCESADO
-
-            # Send emails for protocol 2b transactions
-            protocol_2b_index_to_drop = []
-            for index, row in protocol_2b_df.iterrows():
-                if pd.notna(row.get('CORREO')):
-                    movement_number = row['N° Movimiento']
-                    email_id = generate_secure_unique_id()
-                    subject = f"Transactions Pending Due to Missing Documents - {movement_number}"
-                    message = default_email_message(movement_number, row['Referencia'], email_id)
-                    try:
-                        email_service.send_email(row['CORREO'], subject, message)
-                        protocol_2b_df.at[index, 'EMAIL ID'] = email_id
-                    except Exception as e:
-                        protocol_2b_index_to_drop.append(index)
-                        print(f"Error sending email to {row['CORREO']} from {email_service.user_email}: {str(e)}")
-
-            protocol_2b_df.drop(protocol_2b_index_to_drop, inplace=True)
-
-            # Send whatsapp messages for protocol 3c transactions
-            protocol_3c_index_to_drop = []
-            for index, row in protocol_3c_df.iterrows():
-                if pd.notna(row.get('TELEFONO')):
-                    movement_number = row['N° Movimiento']
-                    cellphone = row['TELEFONO']
-                    wp_id = generate_secure_unique_id()
-                    message = default_whatsapp_message(movement_number, row['Referencia'], wp_id)
-                    try:
-                        whatsapp_messages_queue.put_message(cellphone, message, wp_id)
-                        protocol_3c_df.at[index, 'WP ID'] = wp_id
-                    except Exception as e:
-                        protocol_3c_index_to_drop.append(index)
-                        print(f"Error sending whatsapp message to {cellphone}: {str(e)}")
-
-            protocol_3c_df.drop(protocol_3c_index_to_drop, inplace=True)
-
-            # Add transactions to the worksheet
-            for df in [protocol_2b_df, protocol_3c_df, no_procesado_df]:
-                if not df.empty:
-                    for _, row in df.iterrows():
-                        transaction_service.transactions.add(row.to_dict())
-
-            # Save all changes
-            transaction_service.save_all_changes()
-
-            file_name = f"{datetime.now().strftime(DATE_FORMAT)}_{file.filename}"
-            file_id = google_drive_service.upload_file(file_name, file_stream)
-            
+            upload_movements = np.empty(0, dtype='int64')
+
+            # Parse every file in its own process; the results are taken in
+            # upload order, so the first upload of a transaction is the one kept
+            executor = get_parse_executor()
+            futures = [
+                executor.submit(file_parser.read_file, path, transaction_service.SCHEMA)
+                for path, _, _, _ in data_files
+            ]
+            parsed = []
+            files = []
+            for (path, file_hash, name, archive), future in zip(data_files, futures):
+                try:
+                    transactions_df = future.result()
+                except Exception as e:
+                    print(f"Error parsing {name}: {str(e)}")
+                    job.increment("files_failed")
+                    files.append({"file_name": name, "file_hash": file_hash, "error": str(e)})
+                    continue
+                job.increment("files_parsed")
+                job.increment("rows_parsed", len(transactions_df))
+                parsed.append((transactions_df, file_hash, name, archive))
+
+            frames = [transactions_df for transactions_df, _, _, _ in parsed]
+            new_transactions_df = (
+                transaction_service.SCHEMA.concat(frames) if frames else pd.DataFrame()
+            )
+            # Position in parsed of the file each row comes from
+            sources = np.repeat(np.arange(len(frames)), [len(frame) for frame in frames])
+
+            protocol_2b_dropped = 0
+            protocol_3c_dropped = 0
+            if not new_transactions_df.empty:
+                # Remove transactions that already exist or repeat anywhere in the batch
+                new_transactions_df, upload_movements = remove_known_transactions(new_transactions_df, upload_movements, job)
+            new_counts = np.bincount(sources[new_transactions_df.index.to_numpy('int64')], minlength=len(parsed))
+
+            saved = True
+            if not new_transactions_df.empty:
+                protocol_2b_dropped, protocol_3c_dropped = process_transactions(new_transactions_df, job)
+                # The whole batch is persisted in a single save
+                transaction_service.schedule_save()
+                saved = transaction_service.flush()
+                job.set("save_status", "saved" if saved else "failed")
+            else:
+                job.set("save_status", "nothing to save")
+
+            archive_ids = {}
+            for upload in uploads:
+                archive_ids[id(upload["archive"])] = wait_for_archive(job, upload["archive"])
+
+            for (_, file_hash, name, archive), new_count in zip(parsed, new_counts):
+                file_id = archive_ids[id(archive)]
+                file_summary = {"total_new_transactions": int(new_count), "batch_job_id": job.job_id}
+                # Only files whose rows were persisted are skipped when uploaded again
+                if saved:
+                    file_hash_index.add(file_hash, name, file_summary, file_id)
+                files.append({"file_name": name, "file_hash": file_hash, "summary": file_summary, "file_id": file_id})
+
+            progress = job.to_dict()['progress']
+            return {
+                "response": "Processing completed" if progress["total_new_transactions"] else "No new transactions to process",
+                "summary": build_summary(progress, protocol_2b_dropped, protocol_3c_dropped),
+                "files": files
+            }
+        finally:
+            for upload in uploads:
+                # The archival upload must be done with the file before it is deleted
+                upload["archive"].exception()
+                discard_upload(upload)
+
+    def discard_upload(upload):
+        """Close a spooled batch file and delete it along with the files extracted from it"""
+        upload["file_stream"].close()
+        paths = {path for path, _, _ in upload["data_files"]} | {upload["file_stream"].name}
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    @blueprint.route('/file_processor_batch_api', methods=['POST'])
+    def file_processor_batch_api():
+        files = [file for file in request.files.getlist('files') if file.filename != '']
+        if not files:
+            return jsonify({'error': 'No files in the request'}), 400
+
+        uploads = []
+        skipped = []
+        try:
+            batch_hashes = set()
+            for file in files:
+                # Spool to named files, which the parsing processes open by path
+                file_stream, file_hash = spool_file(file.stream, tempfile.NamedTemporaryFile(suffix='.upload', delete=False))
+                upload = {"file_stream": file_stream, "file_name": file.filename, "data_files": []}
+                uploads.append(upload)
+                if file_stream.tell() == 0:
+                    skipped.append({"file_name": file.filename, "reason": "empty file"})
+                    continue
+
+                # Identical files are processed once, and not again in later batches
+                for path, data_file_hash, name in spool_data_files(file, file_stream, file_hash):
+                    processed = file_hash_index.get(data_file_hash)
+                    if processed is not None:
+                        skipped.append(dict(already_processed_response(processed, data_file_hash), file_name=name))
+                    elif data_file_hash in batch_hashes:
+                        skipped.append({"file_name": name, "file_hash": data_file_hash, "reason": "repeated in the batch"})
+                    else:
+                        batch_hashes.add(data_file_hash)
+                        upload["data_files"].append((path, data_file_hash, name))
+                        continue
+                    if path != file_stream.name:
+                        os.remove(path)
+
+            for upload in uploads:
+                if not upload["data_files"]:
+                    discard_upload(upload)
+            uploads = [upload for upload in uploads if upload["data_files"]]
+            if not uploads:
+                return jsonify({"response": "No new files to process", "skipped": skipped})
+
+            # Archive the uploaded files, zip archives as they are, while the job runs
+            for upload in uploads:
+                upload["archive"] = submit_archive(FileView(upload["file_stream"]), upload["file_name"])
+
+            job_id = job_queue.submit(
+                process_batch, uploads,
+                counters=dict(JOB_COUNTERS, files_parsed=0, files_skipped=0, files_failed=0)
+            )
+
             return jsonify({
-                "response": "Processing completed",
-                "summary": {
-                    "total_new_transactions": len(new_transactions_df),
-                    "protocol_2b_count": len(protocol_2b_df),
-                    "protocol_2b_dropped": len(protocol_2b_index_to_drop),
-                    "protocol_3c_count": len(protocol_3c_df),
-                    "protocol_3c_dropped": len(protocol_3c_index_to_drop),
-                    "no_procesado_count": len(no_procesado_df),
-                },
-                "file_id": file_id
-            })
+                "response": "Processing started",
+                "job_id": job_id,
+                "status_url": f"/jobs/{job_id}",
+                "skipped": skipped
+            }), 202
 
         except Exception as e:
+            for upload in uploads:
+                discard_upload(upload)
             return jsonify({"error": str(e)}), 500
 
+    @blueprint.route('/jobs/<job_id>', methods=['GET'])
+    def job_status(job_id):
+        job = job_queue.get_job(job_id)
+        if job is None:
+            return jsonify({'error': f'Job {job_id} not found'}), 404
+        return jsonify(job)
+
     return blueprint
\ No newline at end of file
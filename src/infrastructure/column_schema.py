@@ -0,0 +1,148 @@
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype, is_numeric_dtype, is_integer_dtype, is_bool_dtype
+
+class ColumnSchema:
+    """
+    Column types of a table, converted with vectorized pandas operations
+    instead of per-cell converters. Data should be read with dtype=object so
+    cells keep the type they had in the source (number, text or date).
+    """
+
+    # Column types
+    NUMBER = 'number'
+    INTEGER = 'integer'
+    STRING = 'string'
+    CATEGORY = 'category'
+
+    NUMERIC_INFERRED_TYPES = ('floating', 'integer', 'mixed-integer-float', 'decimal', 'empty')
+    # Integers from this magnitude on may not survive a round trip through float64
+    MAX_EXACT_FLOAT_INTEGER = 2 ** 53
+
+    def __init__(self, columns: Dict[str, str]):
+        """
+        Initialize the schema
+        Args:
+            columns: Column type by column name. NUMBER parses numbers written
+                with '.' thousands separators and ',' decimals, INTEGER casts to
+                a nullable Int64, STRING to the string dtype and CATEGORY to a
+                categorical of strings
+        """
+        self.columns = columns
+
+    def categorical_columns(self):
+        """Get the names of the CATEGORY columns"""
+        return [column for column, column_type in self.columns.items() if column_type == self.CATEGORY]
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convert the columns of a DataFrame present in the schema
+        Args:
+            df: DataFrame to convert
+        Returns:
+            DataFrame with converted columns
+        """
+        converted = {}
+        for column, column_type in self.columns.items():
+            if column not in df.columns:
+                continue
+            series = self._convert(df[column], column_type)
+            # Columns already in their schema dtype are left untouched
+            if series is not df[column]:
+                converted[column] = series
+        return df.assign(**converted) if converted else df
+
+    def concat(self, frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Concatenate DataFrames keeping the schema dtypes. pd.concat turns
+        categorical columns with different categories into object columns, so
+        the categories of every frame are merged first.
+        Args:
+            frames: DataFrames to concatenate
+        Returns:
+            Concatenated DataFrame with a fresh index
+        """
+        frames = [self.apply(frame) for frame in frames]
+        for column in self.categorical_columns():
+            categories = pd.Index([], dtype='string')
+            for frame in frames:
+                if column in frame.columns:
+                    categories = categories.append(frame[column].cat.categories.difference(categories))
+            frames = [
+                frame.assign(**{column: frame[column].cat.set_categories(categories)})
+                if column in frame.columns and not frame[column].cat.categories.equals(categories) else frame
+                for frame in frames
+            ]
+        return pd.concat(frames, ignore_index=True)
+
+    def _convert(self, series: pd.Series, column_type: str) -> pd.Series:
+        if column_type == self.NUMBER:
+            return self._to_number(series)
+        if column_type == self.INTEGER:
+            return self._to_integer(series)
+        if column_type == self.STRING:
+            return self._to_string(series)
+        if column_type == self.CATEGORY:
+            if isinstance(series.dtype, pd.CategoricalDtype) and series.cat.categories.dtype == 'string':
+                return series
+            return self._to_string(series).astype('category')
+        raise ValueError(f"Unknown column type: {column_type}")
+
+    @staticmethod
+    def _to_string(series: pd.Series) -> pd.Series:
+        if series.dtype == 'string':
+            return series
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series.astype(object).astype('string')
+        if is_numeric_dtype(series) and not is_bool_dtype(series):
+            # Integral floats (ints widened by missing values) are written without '.0'
+            numbers = series.astype('float64')
+            integral = numbers.notna() & (numbers == np.trunc(numbers))
+            if integral[numbers.notna()].all():
+                return numbers.astype('Int64').astype('string')
+        return series.astype('string')
+
+    @classmethod
+    def _to_number(cls, series: pd.Series) -> pd.Series:
+        if series.dtype == 'float64':
+            return series
+        if is_numeric_dtype(series) and not is_bool_dtype(series):
+            return series.astype('float64')
+        series = series.astype(object)
+        inferred = infer_dtype(series, skipna=True)
+        if inferred in cls.NUMERIC_INFERRED_TYPES:
+            return pd.to_numeric(series, errors='coerce').astype('float64')
+
+        # Text cells use '.' as thousands separator and ',' as decimal separator
+        is_text = series.str.len().notna() if inferred in ('string', 'mixed', 'mixed-integer') else pd.Series(False, index=series.index)
+        text = series.where(is_text).astype('string')
+        parsed = pd.to_numeric(
+            text.str.replace('.', '', regex=False).str.replace(',', '.', regex=False),
+            errors='coerce'
+        ).astype('float64')
+        numbers = pd.to_numeric(series.where(~is_text), errors='coerce').astype('float64')
+        return parsed.where(is_text, numbers)
+
+    @classmethod
+    def _to_integer(cls, series: pd.Series) -> pd.Series:
+        if series.dtype == 'Int64':
+            return series
+        if is_integer_dtype(series):
+            return series.astype('Int64')
+        if is_numeric_dtype(series):
+            return np.trunc(series.astype('float64')).astype('Int64')
+
+        numbers = pd.to_numeric(series, errors='coerce')
+        if is_integer_dtype(numbers):
+            return numbers.astype('Int64')
+        if not (numbers.abs() >= cls.MAX_EXACT_FLOAT_INTEGER).any():
+            return np.trunc(numbers.astype('float64')).astype('Int64')
+
+        # float64 can't hold every integer above 2**53, so integer cells are
+        # parsed on their own and only the other cells go through floats
+        text = series.astype('string')
+        is_integer = text.str.fullmatch(r'[+-]?\d+').fillna(False).astype(bool)
+        integers = pd.to_numeric(text.where(is_integer), errors='coerce').astype('Int64')
+        numbers = pd.to_numeric(series.where(~is_integer), errors='coerce').astype('float64')
+        return integers.where(is_integer, np.trunc(numbers).astype('Int64'))
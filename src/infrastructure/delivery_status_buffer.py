@@ -0,0 +1,93 @@
+import atexit
+from threading import Thread, Event, Lock
+from .worksheets.transactions_worksheet import TransactionsWorksheet
+from .worksheets.states_worksheet import StatesWorksheet
+
+class DeliveryStatusBuffer:
+    """
+    Collects the outcomes of WhatsApp sends and writes them to the
+    transactions worksheet in periodic batches: one in-memory update and one
+    scheduled save per flush instead of a sheet write per message
+    """
+
+    # Seconds between flushes of the buffered outcomes
+    FLUSH_INTERVAL = 10
+    # Flushes an outcome is kept for while its transaction isn't in the worksheet yet
+    MAX_MISSES = 6
+
+    def __init__(self, transaction_service, flush_interval: float = FLUSH_INTERVAL):
+        """
+        Initialize the buffer
+        Args:
+            transaction_service: TransactionSheetService with the transactions
+            flush_interval: Seconds between flushes
+        """
+        self.transaction_service = transaction_service
+        self.flush_interval = flush_interval
+        # Latest outcome and missed flushes by WP ID
+        self._outcomes = {}
+        self._lock = Lock()
+        self._stop = Event()
+
+        self.flush_thread = Thread(target=self._flush_loop, daemon=True)
+        self.flush_thread.start()
+        atexit.register(self.close)
+
+    def record(self, wp_id: str, sent: bool):
+        """
+        Buffer the outcome of a message, replacing any earlier one of the same WP ID
+        Args:
+            wp_id: WP ID of the transaction the message was about
+            sent: True if the message was delivered to the provider, False if
+                it ran out of retries
+        """
+        with self._lock:
+            self._outcomes[wp_id] = (sent, 0)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write the buffered outcomes to the transactions worksheet and schedule
+        its save. Failed sends also move the transaction to the ENVIO_FALLIDO state.
+        Returns:
+            int: Number of outcomes written
+        """
+        with self._lock:
+            outcomes, self._outcomes = self._outcomes, {}
+        if not outcomes:
+            return 0
+
+        updates = {
+            wp_id: (
+                {'ESTADO WP': TransactionsWorksheet.WP_ENVIADO} if sent else
+                {'ESTADO WP': TransactionsWorksheet.WP_FALLIDO, 'ESTADO DE REMEDIACION': StatesWorksheet.ENVIO_FALLIDO}
+            )
+            for wp_id, (sent, _) in outcomes.items()
+        }
+        missing = self.transaction_service.transactions.update_many('WP ID', updates)
+
+        # The transactions of an upload are added after its messages are queued,
+        # so an outcome can arrive before its row; it is retried on later flushes
+        with self._lock:
+            for wp_id in missing:
+                sent, misses = outcomes[wp_id]
+                if misses + 1 >= self.MAX_MISSES:
+                    print(f"No transaction found with WP ID: {wp_id}, delivery status dropped")
+                elif wp_id not in self._outcomes:
+                    self._outcomes[wp_id] = (sent, misses + 1)
+
+        written = len(outcomes) - len(missing)
+        if written:
+            self.transaction_service.schedule_save([self.transaction_service.TRANSACTIONS_WORKSHEET])
+        return written
+
+    def close(self):
+        """Stop the flush thread and write what is still buffered"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self.flush_thread.join()
+        self.flush()
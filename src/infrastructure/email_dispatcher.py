@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+from typing import Optional, List, Tuple, Dict, Any, Callable
+import time
+
+class EmailDispatcher:
+    """
+    Sends batches of emails through an EmailService from a bounded thread
+    pool, spacing the sends so they stay under the Gmail rate limit
+    """
+
+    MAX_WORKERS = 4
+    # messages.send costs 100 quota units out of the 15,000 per user per minute
+    RATE_LIMIT = 2.5
+
+    def __init__(self, email_service, max_workers: int = MAX_WORKERS, rate_limit: float = RATE_LIMIT):
+        """
+        Initialize the email dispatcher
+        Args:
+            email_service: EmailService used to send the emails
+            max_workers: Maximum number of emails sent concurrently
+            rate_limit: Maximum number of emails started per second
+        """
+        self.email_service = email_service
+        self.max_workers = max_workers
+        self.rate_limit = rate_limit
+        self._interval = 1.0 / rate_limit if rate_limit else 0.0
+        self._next_send_at = 0.0
+        self._lock = Lock()
+
+    def _wait_for_slot(self):
+        """Block until the next send is allowed by the rate limit"""
+        with self._lock:
+            now = time.monotonic()
+            send_at = max(now, self._next_send_at)
+            self._next_send_at = send_at + self._interval
+        if send_at > now:
+            time.sleep(send_at - now)
+
+    def _send(self, to: str, subject: str, message_text: str) -> str:
+        self._wait_for_slot()
+        return self.email_service.send_email(to, subject, message_text)
+
+    def send_many(self, emails: List[Tuple[Any, str, str, str]],
+                  on_result: Optional[Callable[[Any, Optional[Exception]], None]] = None) -> Dict[Any, Optional[Exception]]:
+        """
+        Send several emails concurrently
+        Args:
+            emails: List of (key, to, subject, message_text) tuples; the key
+                identifies the email in the results, for example a row index
+            on_result: Optional callback called as on_result(key, error) as
+                soon as each email is sent or fails
+        Returns:
+            Dict mapping each key to None if its email was sent, or to the
+            exception raised when sending it
+        """
+        results = {}
+        if not emails:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(emails))) as executor:
+            futures = {
+                executor.submit(self._send, to, subject, message_text): key
+                for key, to, subject, message_text in emails
+            }
+            for future in as_completed(futures):
+                key = futures[future]
+                error = future.exception()
+                results[key] = error
+                if on_result is not None:
+                    on_result(key, error)
+        return results
@@ -1,9 +1,15 @@
+import threading
+import httplib2
 from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
 from email.mime.text import MIMEText
 import base64
 
 class EmailService:
+    # Gmail accepts up to 100 calls per batch HTTP request
+    BATCH_SIZE = 100
+
     def __init__(self, service_account_file, user_email):
         self.service_account_file = service_account_file
         self.user_email = user_email
@@ -12,14 +18,24 @@ class EmailService:
             'https://www.googleapis.com/auth/gmail.send',
             'https://www.googleapis.com/auth/gmail.modify'
         ]
-        self.service = self._build_service()
-
-    def _build_service(self):
-        credentials = service_account.Credentials.from_service_account_file(
+        self.credentials = service_account.Credentials.from_service_account_file(
             self.service_account_file,
             scopes=self.scopes
         ).with_subject(self.user_email)
-        return build('gmail', 'v1', credentials=credentials)
+        self.service = self._build_service()
+        # httplib2 connections can't be shared between threads
+        self._thread_local = threading.local()
+
+    def _build_service(self):
+        return build('gmail', 'v1', credentials=self.credentials)
+
+    def _http(self):
+        """Get the authorized HTTP connection of the calling thread"""
+        http = getattr(self._thread_local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http())
+            self._thread_local.http = http
+        return http
 
     def send_email(self, to, subject, message_text):
         message = self._create_message(to, subject, message_text)
@@ -34,16 +50,91 @@ class EmailService:
         return {'raw': raw}
 
     def _send_message(self, message):
-        result = self.service.users().messages().send(userId='me', body=message).execute()
+        result = self.service.users().messages().send(userId='me', body=message).execute(http=self._http())
         return result['id']
 
+    def _execute_batch(self, requests):
+        # Run (key, request) pairs in batch HTTP requests of up to BATCH_SIZE calls
+        # and return {key: (response, exception)}, so failures are reported per item
+        results = {}
+        for start in range(0, len(requests), self.BATCH_SIZE):
+            chunk = requests[start:start + self.BATCH_SIZE]
+            keys = {}
+
+            def callback(request_id, response, exception):
+                results[keys[request_id]] = (response, exception)
+
+            batch = self.service.new_batch_http_request(callback=callback)
+            for position, (key, request) in enumerate(chunk):
+                request_id = str(position)
+                keys[request_id] = key
+                batch.add(request, request_id=request_id)
+            batch.execute(http=self._http())
+        return results
+
+    def send_emails(self, emails):
+        # Send (to, subject, message_text) emails in batches.
+        # Returns one {'id', 'error'} result per email, in order
+        messages = self.service.users().messages()
+        requests = [
+            (position, messages.send(userId='me', body=self._create_message(to, subject, message_text)))
+            for position, (to, subject, message_text) in enumerate(emails)
+        ]
+        results = self._execute_batch(requests)
+        return [
+            {'id': response['id'] if exception is None else None, 'error': exception}
+            for response, exception in (results[position] for position in range(len(emails)))
+        ]
+
+    def get_messages(self, message_ids):
+        # Fetch messages in batches.
+        # Returns one {'id', 'subject', 'from', 'body', 'error'} result per message, in order
+        messages = self.service.users().messages()
+        requests = [(message_id, messages.get(userId='me', id=message_id)) for message_id in message_ids]
+        results = self._execute_batch(requests)
+        details = []
+        for message_id in message_ids:
+            response, exception = results[message_id]
+            if exception is not None:
+                details.append({'id': message_id, 'subject': None, 'from': None, 'body': None, 'error': exception})
+            else:
+                details.append(dict(self._parse_message(message_id, response), error=None))
+        return details
+
+    def mark_as_read_many(self, message_ids):
+        # Remove the UNREAD label from messages in batches.
+        # Returns one {'id', 'error'} result per message, in order
+        messages = self.service.users().messages()
+        requests = [
+            (message_id, messages.modify(userId='me', id=message_id, body={'removeLabelIds': ['UNREAD']}))
+            for message_id in message_ids
+        ]
+        results = self._execute_batch(requests)
+        return [{'id': message_id, 'error': results[message_id][1]} for message_id in message_ids]
+
     def read_unread_emails(self, max_results=3):
         response = self.service.users().messages().list(userId='me', labelIds=['UNREAD'], maxResults=max_results).execute()
-        messages = response.get('messages', [])
-        return [self._get_message_details(msg['id']) for msg in messages]
+        message_ids = [msg['id'] for msg in response.get('messages', [])]
+        if not message_ids:
+            return []
+
+        # One round trip to fetch the messages and one to mark them as read
+        details = self.get_messages(message_ids)
+        for detail in details:
+            if detail['error'] is not None:
+                print(f"Error reading email {detail['id']}: {detail['error']}")
+        fetched = [detail for detail in details if detail['error'] is None]
 
-    def _get_message_details(self, message_id):
-        msg_detail = self.service.users().messages().get(userId='me', id=message_id).execute()
+        for result in self.mark_as_read_many([detail['id'] for detail in fetched]):
+            if result['error'] is not None:
+                print(f"Error marking email {result['id']} as read: {result['error']}")
+
+        return [
+            {'id': detail['id'], 'subject': detail['subject'], 'from': detail['from'], 'body': detail['body']}
+            for detail in fetched
+        ]
+
+    def _parse_message(self, message_id, msg_detail):
         payload = msg_detail.get('payload', {})
         headers = payload.get('headers', [])
 
@@ -52,8 +143,6 @@ class EmailService:
 
         body = self._extract_body(payload)
 
-        self._mark_as_read(message_id)
-
         return {
             'id': message_id,
             'subject': subject,
@@ -73,10 +162,3 @@ class EmailService:
             if body_data:
                 return base64.urlsafe_b64decode(body_data).decode('utf-8')
         return None
-
-    def _mark_as_read(self, message_id):
-        self.service.users().messages().modify(
-            userId='me',
-            id=message_id,
-            body={'removeLabelIds': ['UNREAD']}
-        ).execute() 
\ No newline at end of file
@@ -0,0 +1,93 @@
+import json
+import os
+from datetime import datetime
+from threading import Lock
+from typing import Optional, Dict, Any, BinaryIO
+import xxhash
+
+class FileHashIndex:
+    """
+    Persistent index of processed files by content hash. Each hash maps to
+    the result summary and the Drive file ID of the upload that processed
+    it, so identical uploads can be answered without processing them again.
+    """
+
+    DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+    # Bytes read at a time when hashing a file
+    READ_SIZE = 1024 * 1024
+
+    def __init__(self, file_path: Optional[str] = None):
+        """
+        Initialize the index
+        Args:
+            file_path: Optional JSON file the index is loaded from, if it
+                exists, and written to after every change; the index is only
+                kept in memory when omitted
+        """
+        self.file_path = file_path
+        self._lock = Lock()
+        self._entries = {}
+        if file_path and os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+
+    @classmethod
+    def hash_file(cls, file: BinaryIO, copy_to: Optional[BinaryIO] = None) -> str:
+        """
+        Hash the content of a file from its current position, reading it in blocks
+        Args:
+            file: Binary file to hash
+            copy_to: Optional binary file every block is also written to, to
+                hash a file while it is being copied
+        Returns:
+            str: Hex digest of the content
+        """
+        hasher = xxhash.xxh3_128()
+        for block in iter(lambda: file.read(cls.READ_SIZE), b''):
+            hasher.update(block)
+            if copy_to is not None:
+                copy_to.write(block)
+        return hasher.hexdigest()
+
+    def get(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a processed file
+        Args:
+            file_hash: Content hash of the file
+        Returns:
+            Optional[Dict]: 'file_name', 'summary', 'file_id' and
+            'processed_at' of the file, None if it wasn't processed
+        """
+        with self._lock:
+            entry = self._entries.get(file_hash)
+            return dict(entry) if entry is not None else None
+
+    def add(self, file_hash: str, file_name: str, summary: Dict[str, Any], file_id: Optional[str]):
+        """
+        Record a processed file
+        Args:
+            file_hash: Content hash of the file
+            file_name: Name the file was uploaded with
+            summary: Result summary of the processing
+            file_id: ID of the file archived in Drive
+        """
+        with self._lock:
+            self._entries[file_hash] = {
+                'file_name': file_name,
+                'summary': summary,
+                'file_id': file_id,
+                'processed_at': datetime.now().strftime(self.DATE_FORMAT)
+            }
+            self._persist()
+
+    def _persist(self):
+        """Write the index to its file, replacing the previous one atomically"""
+        if not self.file_path:
+            return
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.file_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(temp_path, self.file_path)
@@ -0,0 +1,58 @@
+import io
+import mmap
+import os
+from typing import BinaryIO
+
+class FileView(io.RawIOBase):
+    """
+    Read-only, seekable view of an open file. The file is memory-mapped, so
+    several views of the same file share its pages instead of copying it,
+    and each view keeps its own read position.
+    """
+
+    def __init__(self, file: BinaryIO):
+        """
+        Initialize the view
+        Args:
+            file: Open, non-empty file with a file descriptor
+        """
+        super().__init__()
+        self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        end = min(self._position + len(b), len(self._buffer))
+        size = max(0, end - self._position)
+        b[:size] = self._buffer[self._position:end]
+        self._position += size
+        return size
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            position = offset
+        elif whence == os.SEEK_CUR:
+            position = self._position + offset
+        elif whence == os.SEEK_END:
+            position = len(self._buffer) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._buffer.release()
+            self._mmap.close()
+        super().close()
@@ -35,7 +35,7 @@ class GoogleDriveService:
         Upload a file to Google Drive
         Args:
             file_name: Name of the file to be uploaded
-            file_content: BytesIO object containing the file content
+            file_content: BytesIO object, or any seekable binary file, containing the file content
         Returns:
             Optional[str]: The ID of the uploaded file if successful, None otherwise
         """
@@ -1,78 +1,451 @@
 import os
+import re
+from threading import Lock, RLock
 from typing import Optional, List, Dict, Any
+import numpy as np
 import pandas as pd
-import gspread
-from gspread_dataframe import set_with_dataframe, get_as_dataframe
-from google.oauth2.service_account import Credentials
+from pandas.io.parsers import TextParser
+from gspread.utils import rowcol_to_a1, fill_gaps
+from .sheet_backend import SheetBackend, GspreadSheetBackend
+from .sqlite_mirror import SQLiteMirror
+from .column_schema import ColumnSchema
 
 class GoogleSheetsService:
-    def __init__(self, service_account_file: str, sheet_id: str, worksheet_name: str, converters: Dict[str, Any] = None):
+    """
+    In-memory copy of a worksheet. The DataFrame in self._df is a published
+    version that is never modified in place: writers build a new version
+    under the lock, replacing the updated columns with updated copies, and
+    publish it by swapping the reference, so readers can take snapshots of
+    it without locking.
+    """
+
+    # Save modes
+    SAVE_MODE_DELTA = 'delta'
+    SAVE_MODE_FULL = 'full'
+
+    UNNAMED_COLUMN_PATTERN = re.compile(r'^Unnamed:\s\d+$')
+
+    def __init__(self, service_account_file: str, sheet_id: str, worksheet_name: str, schema: ColumnSchema = None, save_mode: str = SAVE_MODE_DELTA, index_columns: List[str] = None, backend: SheetBackend = None, values: List[List[Any]] = None, mirror: SQLiteMirror = None):
         """
         Initialize the Google Sheets Service
         Args:
             service_account_file: Path to the service account JSON file
             sheet_id: ID of the Google Sheet
             worksheet_name: Name of the worksheet to work with
+            schema: Optional column types, applied with vectorized conversions
+                when the worksheet is loaded and when rows are added
+            save_mode: SAVE_MODE_DELTA to push only changed and appended rows,
+                SAVE_MODE_FULL to rewrite the whole worksheet on every save
+            index_columns: Optional key columns kept in hash indexes for
+                find_row and update_row lookups
+            backend: Optional storage shared with other services, such as a
+                GspreadSheetBackend or an InMemorySheetBackend; when omitted
+                the service opens the Google Sheet itself
+            values: Optional worksheet values already downloaded (for example
+                with the backend's batch_get_values); when omitted they are fetched
+            mirror: Optional local SQLite mirror. When set, the worksheet is
+                loaded from the mirror if present there, save_changes writes to
+                the mirror and sync_changes pushes the changes to the worksheet
         """
         self.service_account_file = service_account_file
         self.sheet_id = sheet_id
         self.worksheet_name = worksheet_name
-        self.scopes = [
-            'https://www.googleapis.com/auth/spreadsheets',
-            'https://www.googleapis.com/auth/drive'
+        self.save_mode = save_mode
+        self.index_columns = index_columns or []
+        self.mirror = mirror
+        self._lock = RLock()
+        # Held across a whole push, so pushes never overlap, while the
+        # network I/O happens outside self._lock
+        self._push_lock = Lock()
+        # Pushes to the worksheet so far, to tell whether a save wrote to it
+        self._push_count = 0
+        self.backend = backend if backend is not None else GspreadSheetBackend(service_account_file, sheet_id)
+        # Initialize DataFrame from the mirror or the worksheet
+        self.schema = schema
+        mirrored = self.mirror.load(worksheet_name) if self.mirror is not None and values is None else None
+        if mirrored is not None:
+            self._set_mirrored_dataframe(mirrored)
+        else:
+            self._set_loaded_dataframe(self._load_dataframe(values))
+            self._write_mirror(replace=True)
+        # Rows and DataFrames added but not yet merged into the DataFrame
+        self._clear_pending_rows()
+        self._build_indexes()
+
+    def _load_dataframe(self, values: List[List[Any]] = None) -> pd.DataFrame:
+        """
+        Load data from worksheet into DataFrame, parsing it the same way as
+        gspread_dataframe's get_as_dataframe
+        Args:
+            values: Worksheet values already downloaded, fetched if omitted
+        Returns:
+            DataFrame containing worksheet data
+        """
+        if values is None:
+            values = self.backend.get_values(self.worksheet_name)
+        if not values:
+            return pd.DataFrame()
+
+        # With a schema, cells keep their raw type and are converted column by column
+        df = TextParser(fill_gaps(values), dtype=object if self.schema is not None else None).read()
+        # Drop empty rows and empty columns without a header
+        df = df.dropna(how='all', axis=0)
+        empty_unnamed = [
+            column for column in df.columns
+            if isinstance(column, str) and self.UNNAMED_COLUMN_PATTERN.search(column) and df[column].isna().all()
         ]
-        self.worksheet = self._initialize_worksheet()
-        # Initialize DataFrame from worksheet
-        self.converters = converters
-        self._df = self._load_dataframe()
+        df = df.drop(columns=empty_unnamed)
+        return self.schema.apply(df) if self.schema is not None else df
+
+    def _set_loaded_dataframe(self, df: pd.DataFrame):
+        """
+        Use a DataFrame loaded from the worksheet as the in-memory DataFrame.
+        get_as_dataframe drops empty rows but keeps the original labels, so
+        the worksheet row of each DataFrame row is recorded before the index
+        is reset.
+        """
+        # Label 0 is worksheet row 2 (row 1 is the header)
+        self._sheet_rows = [int(label) + 2 for label in df.index]
+        self._df = df.reset_index(drop=True)
+        self._dirty_rows = set()
+        self._pushing_rows = set()
+        self._mark_saved(len(self._df), list(self._df.columns))
+        self._mark_mirrored()
+
+    def _set_mirrored_dataframe(self, mirrored: Dict[str, Any]):
+        """Use a worksheet loaded from the mirror, with its pending sync state"""
+        self._df = mirrored['dataframe']
+        if self.schema is not None:
+            self._df = self.schema.apply(self._df)
+        self._saved_columns = mirrored['synced_columns']
+        self._saved_row_count = mirrored['synced_row_count']
+        self._sheet_rows = mirrored['sheet_rows']
+        self._dirty_rows = set(mirrored['dirty_rows'])
+        self._pushing_rows = set()
+        self._mark_mirrored()
+
+    def _mark_mirrored(self):
+        """Record the current DataFrame as the state written to the mirror"""
+        self._mirrored_row_count = len(self._df)
+        self._mirrored_columns = list(self._df.columns)
+        self._mirror_dirty_rows = set()
+
+    def _mark_dirty(self, positions: List[int]):
+        """Record updated row positions for the next mirror write and sheet sync"""
+        self._dirty_rows.update(positions)
+        self._mirror_dirty_rows.update(positions)
 
-    def _initialize_worksheet(self):
+    def _sync_state(self) -> Dict[str, Any]:
+        """Get the state of the worksheet relative to the last push to the sheet"""
+        return {
+            'synced_columns': list(self._saved_columns),
+            'synced_row_count': self._saved_row_count,
+            'sheet_rows': list(self._sheet_rows),
+            # Rows being pushed stay dirty until the push is done
+            'dirty_rows': self._dirty_rows | self._pushing_rows
+        }
+
+    def _write_mirror(self, replace: bool = False):
+        """
+        Write the changes since the last mirror write to the mirror, if any
+        Args:
+            replace: Rewrite every row instead of only the changed ones
+        """
+        if self.mirror is None:
+            return
+        if (replace
+                or list(self._df.columns) != self._mirrored_columns
+                or len(self._df) < self._mirrored_row_count):
+            positions = None
+        else:
+            appended = range(self._mirrored_row_count, len(self._df))
+            positions = sorted(self._mirror_dirty_rows.union(appended))
+        self.mirror.write(self.worksheet_name, self._df, positions, self._sync_state())
+        self._mark_mirrored()
+
+    def _build_indexes(self):
+        """Rebuild the key column indexes from the in-memory DataFrame"""
+        self._indexes = {}
+        self._index_rows(0)
+
+    def _index_rows(self, start: int):
+        """
+        Add the DataFrame rows from position start onwards to the key column indexes
+        Args:
+            start: Position of the first row to index
         """
-        Initialize and return the worksheet
+        for column in self.index_columns:
+            if column not in self._df.columns:
+                continue
+            first = start
+            if column not in self._indexes:
+                # A column that appeared after the indexes were built is
+                # indexed from its first row
+                self._indexes[column] = {}
+                first = 0
+            index = self._indexes[column]
+            values = self._df[column].iloc[first:].tolist()
+            for position, value in enumerate(values, first):
+                if pd.isnull(value) is True:
+                    continue
+                index.setdefault(value, []).append(position)
+
+    def _reindex_rows(self, column: str, positions: List[int], new_value: Any):
+        """
+        Move the given rows to a new key in the index of column, once the
+        new column values are ready but before they are published
+        """
+        index = self._indexes[column]
+        column_loc = self._df.columns.get_loc(column)
+        for position in positions:
+            old_value = self._df.iat[position, column_loc]
+            old_positions = index.get(old_value) if pd.isnull(old_value) is not True else None
+            if old_positions is not None and position in old_positions:
+                old_positions.remove(position)
+                if not old_positions:
+                    del index[old_value]
+            if pd.isnull(new_value) is not True:
+                index.setdefault(new_value, []).append(position)
+
+    def _indexed_positions(self, column_name: str, value: Any) -> Optional[List[int]]:
+        """
+        Look up the row positions for a value in the index of a key column
         Returns:
-            The worksheet object
+            Optional[List[int]]: Matching positions, None if the column isn't indexed
         """
-        credentials = Credentials.from_service_account_file(
-            self.service_account_file,
-            scopes=self.scopes
+        if column_name not in self._indexes:
+            return None
+        try:
+            return list(self._indexes[column_name].get(value, []))
+        except TypeError:
+            # Unhashable search values fall back to a full scan
+            return None
+
+    def _column_copy(self, column: str) -> pd.Series:
+        """Copy a column of the current version to update it, or create an empty one"""
+        if column in self._df.columns:
+            return self._df[column].copy()
+        return pd.Series(np.nan, index=self._df.index, dtype=object)
+
+    @staticmethod
+    def _set_value(values: pd.Series, positions: List[int], value: Any) -> pd.Series:
+        """
+        Set a value at some positions of a column copy, adding it to the
+        categories of a categorical column first
+        Returns:
+            The updated column
+        """
+        if (isinstance(values.dtype, pd.CategoricalDtype)
+                and pd.isnull(value) is not True and value not in values.cat.categories):
+            values = values.cat.add_categories([value])
+        values.iloc[positions] = value
+        return values
+
+    def _publish_columns(self, columns: Dict[str, pd.Series]):
+        """Publish a new version of the DataFrame with some columns replaced"""
+        df = self._df.copy(deep=False)
+        for column, values in columns.items():
+            # Replacing a whole column never writes into the previous version
+            df[column] = values
+        self._df = df
+
+    def _clear_pending_rows(self):
+        self._pending_rows = []
+        self._pending_frames = []
+
+    def _has_pending_rows(self) -> bool:
+        return bool(self._pending_rows) or bool(self._pending_frames)
+
+    def _pending_row_count(self) -> int:
+        return len(self._pending_rows) + sum(len(frame) for frame in self._pending_frames)
+
+    def _merge_pending_rows(self):
+        """Merge the buffered rows into the in-memory DataFrame with a single concat"""
+        if not self._has_pending_rows():
+            return
+        # Buffered dict rows always come after the buffered DataFrames
+        frames = list(self._pending_frames)
+        if self._pending_rows:
+            frames.append(pd.DataFrame(self._pending_rows))
+        self._clear_pending_rows()
+        start = len(self._df)
+        if self.schema is not None:
+            self._df = self.schema.concat([self._df] + frames)
+        else:
+            self._df = pd.concat([self._df] + frames, ignore_index=True)
+        self._index_rows(start)
+
+    def _next_sheet_row(self) -> int:
+        """Get the worksheet row following the last persisted row"""
+        return self._sheet_rows[-1] + 1 if self._sheet_rows else 2
+
+    def _mark_saved(self, row_count: int, columns: List[str]):
+        """
+        Record the first row_count rows of the DataFrame, with the given
+        columns, as the state persisted in the worksheet
+        """
+        appended = row_count - len(self._sheet_rows)
+        if appended > 0:
+            next_row = self._next_sheet_row()
+            self._sheet_rows.extend(range(next_row, next_row + appended))
+        self._saved_row_count = row_count
+        self._saved_columns = columns
+        self._pushing_rows = set()
+
+    def _needs_full_rewrite(self) -> bool:
+        """
+        Check whether the pending changes can't be expressed as a delta
+        Returns:
+            bool: True if the whole worksheet has to be rewritten
+        """
+        return (
+            self.save_mode == self.SAVE_MODE_FULL
+            or list(self._df.columns) != self._saved_columns
+            or len(self._df) < self._saved_row_count
         )
-        gc = gspread.authorize(credentials)
-        spreadsheet = gc.open_by_key(self.sheet_id)
-        return spreadsheet.worksheet(self.worksheet_name)
 
-    def _load_dataframe(self) -> pd.DataFrame:
+    def _row_values(self, start: int, stop: int) -> List[List[Any]]:
+        """
+        Get the worksheet values for the DataFrame rows in [start, stop)
+        """
+        rows = self._df.iloc[start:stop].to_numpy('object')
+        return [[self.backend.cell_value(value) for value in row] for row in rows]
+
+    def _dirty_ranges(self) -> List[Dict[str, Any]]:
         """
-        Load data from worksheet into DataFrame
+        Group the dirty rows into contiguous A1 ranges with their values
         Returns:
-            DataFrame containing worksheet data
+            List of {'range', 'values'} dictionaries for a batch update
+        """
+        ranges = []
+        last_col = len(self._df.columns)
+        positions = sorted(p for p in self._dirty_rows if p < self._saved_row_count)
+        start = None
+        for i, position in enumerate(positions):
+            if start is None:
+                start = position
+            next_position = position + 1
+            if (i + 1 < len(positions) and positions[i + 1] == next_position
+                    and self._sheet_rows[next_position] == self._sheet_rows[position] + 1):
+                continue
+            ranges.append({
+                'range': f"{rowcol_to_a1(self._sheet_rows[start], 1)}:{rowcol_to_a1(self._sheet_rows[position], last_col)}",
+                'values': self._row_values(start, next_position)
+            })
+            start = None
+        return ranges
+
+    def has_changes(self) -> bool:
+        """
+        Check whether the in-memory DataFrame has changes not yet saved
+        (to the mirror if there is one, to the worksheet otherwise)
+        Returns:
+            bool: True if there are pending changes
+        """
+        if self.mirror is None:
+            return self.has_unsynced_changes()
+        return (
+            bool(self._mirror_dirty_rows)
+            or self._has_pending_rows()
+            or len(self._df) != self._mirrored_row_count
+            or list(self._df.columns) != self._mirrored_columns
+        )
+
+    def change_count(self) -> int:
+        """
+        Count the rows changed or added since the last save
+        Returns:
+            int: Number of changed rows
         """
-        return get_as_dataframe(self.worksheet, converters=self.converters)
+        if self.mirror is None:
+            dirty_rows, saved_row_count = self._dirty_rows, self._saved_row_count
+        else:
+            dirty_rows, saved_row_count = self._mirror_dirty_rows, self._mirrored_row_count
+        return len(dirty_rows) + self._pending_row_count() + max(0, len(self._df) - saved_row_count)
+
+    def has_unsynced_changes(self) -> bool:
+        """
+        Check whether the in-memory DataFrame has changes not yet pushed to the worksheet
+        Returns:
+            bool: True if there are pending changes
+        """
+        return (
+            bool(self._dirty_rows)
+            or self._has_pending_rows()
+            or len(self._df) != self._saved_row_count
+            or list(self._df.columns) != self._saved_columns
+        )
 
     def read_all_data(self) -> pd.DataFrame:
         """
-        Read all data from the in-memory DataFrame
+        Read all data from the in-memory DataFrame. The snapshot is a shallow
+        copy of the current version taken without locking; updates publish
+        new columns instead of writing into it, so it doesn't change
+        afterwards. It must be treated as read-only.
         Returns:
             DataFrame containing all worksheet data
         """
-        return self._df.copy()
+        if self._has_pending_rows():
+            with self._lock:
+                self._merge_pending_rows()
+        return self._df.copy(deep=False)
 
     def add_row(self, row_data: Dict[str, Any]) -> bool:
         """
-        Add a new row to the in-memory DataFrame
+        Add a new row to the in-memory DataFrame. The row is buffered and
+        merged into the DataFrame on the next read or save.
         Args:
             row_data: Dictionary containing column names and values
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            # Add new row to DataFrame
-            new_df = pd.concat([self._df, pd.DataFrame([row_data])], ignore_index=True)
-            self._df = new_df
+            with self._lock:
+                self._pending_rows.append(dict(row_data))
             return True
         except Exception as e:
             print(f"Error adding row: {e}")
             return False
 
+    def add_rows(self, rows_data: List[Dict[str, Any]]) -> bool:
+        """
+        Add several rows to the in-memory DataFrame at once. The rows are
+        buffered and merged into the DataFrame on the next read or save.
+        Args:
+            rows_data: List of dictionaries containing column names and values
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            rows_data = [dict(row_data) for row_data in rows_data]
+            with self._lock:
+                self._pending_rows.extend(rows_data)
+            return True
+        except Exception as e:
+            print(f"Error adding rows: {e}")
+            return False
+
+    def add_dataframe(self, df: pd.DataFrame) -> bool:
+        """
+        Add the rows of a DataFrame to the in-memory DataFrame at once,
+        without converting them to dictionaries. The rows are buffered and
+        merged into the DataFrame on the next read or save.
+        Args:
+            df: DataFrame whose columns are worksheet columns
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            with self._lock:
+                if self._pending_rows:
+                    self._pending_frames.append(pd.DataFrame(self._pending_rows))
+                    self._pending_rows = []
+                self._pending_frames.append(df.reset_index(drop=True))
+            return True
+        except Exception as e:
+            print(f"Error adding rows: {e}")
+            return False
+
     def find_row(self, column_name: str, value: Any) -> Optional[pd.DataFrame]:
         """
         Find rows where the specified column matches the given value
@@ -83,8 +456,17 @@ class GoogleSheetsService:
             Optional[DataFrame]: DataFrame containing matching rows, None if not found
         """
         try:
-            matches = self._df[self._df[column_name] == value]
-            return matches.copy() if not matches.empty else None
+            with self._lock:
+                self._merge_pending_rows()
+                positions = self._indexed_positions(column_name, value)
+                if positions is not None:
+                    return self._df.iloc[positions] if positions else None
+
+            # Full scans run on a snapshot, without holding the lock
+            df = self._df
+            mask = (df[column_name] == value).to_numpy(dtype=bool, na_value=False)
+            matches = df[mask]
+            return matches if not matches.empty else None
         except Exception as e:
             print(f"Error finding row: {e}")
             return None
@@ -100,21 +482,82 @@ class GoogleSheetsService:
             bool: True if successful, False otherwise
         """
         try:
-            # Find the row index
-            mask = self._df[column_name] == search_value
-            if not mask.any():
-                print(f"No row found with {column_name} = {search_value}")
-                return False
-            
-            # Update the row in DataFrame
-            for col, val in update_data.items():
-                self._df.loc[mask, col] = val
-            
-            return True
+            with self._lock:
+                self._merge_pending_rows()
+                # Find the row positions
+                positions = self._indexed_positions(column_name, search_value)
+                if positions is None:
+                    mask = (self._df[column_name] == search_value).to_numpy(dtype=bool, na_value=False)
+                    positions = mask.nonzero()[0].tolist()
+                if not positions:
+                    print(f"No row found with {column_name} = {search_value}")
+                    return False
+
+                # Update the rows in a new version, copying only the updated columns
+                columns = {}
+                for col, val in update_data.items():
+                    values = columns[col] if col in columns else self._column_copy(col)
+                    columns[col] = self._set_value(values, positions, val)
+
+                # The indexes only change once every value was set
+                for col, val in update_data.items():
+                    if col in self._indexes:
+                        self._reindex_rows(col, positions, val)
+                self._publish_columns(columns)
+                self._mark_dirty(positions)
+                return True
         except Exception as e:
             print(f"Error updating row: {e}")
             return False
 
+    def update_rows(self, column_name: str, updates: Dict[Any, Dict[str, Any]]) -> List[Any]:
+        """
+        Update the rows matching several search values in a single new
+        version of the in-memory DataFrame
+        Args:
+            column_name: Name of the column to search in
+            updates: Dictionary mapping each search value to the column names
+                and new values of its rows
+        Returns:
+            List: The search values that matched no row
+        """
+        try:
+            with self._lock:
+                self._merge_pending_rows()
+                # Group the rows by the value they get, to assign each value once
+                targets = {}
+                missing = []
+                for search_value, update_data in updates.items():
+                    positions = self._indexed_positions(column_name, search_value)
+                    if positions is None:
+                        mask = (self._df[column_name] == search_value).to_numpy(dtype=bool, na_value=False)
+                        positions = mask.nonzero()[0].tolist()
+                    if not positions:
+                        missing.append(search_value)
+                        continue
+                    for col, val in update_data.items():
+                        targets.setdefault((col, val), []).extend(positions)
+                if not targets:
+                    return missing
+
+                columns = {}
+                dirty = set()
+                for (col, val), positions in targets.items():
+                    values = columns[col] if col in columns else self._column_copy(col)
+                    columns[col] = self._set_value(values, positions, val)
+                    dirty.update(positions)
+
+                # The indexes only change once every value was set
+                for (col, val), positions in targets.items():
+                    if col in self._indexes:
+                        self._reindex_rows(col, positions, val)
+                self._publish_columns(columns)
+                self._mark_dirty(sorted(dirty))
+                return missing
+        except Exception as e:
+            print(f"Error updating rows: {e}")
+            return list(updates)
+
     def clear_data(self) -> bool:
         """
         Clear all data from the in-memory DataFrame
@@ -122,7 +565,10 @@ class GoogleSheetsService:
             bool: True if successful, False otherwise
         """
         try:
-            self._df = pd.DataFrame(columns=self._df.columns)
+            with self._lock:
+                self._clear_pending_rows()
+                self._df = pd.DataFrame(columns=self._df.columns)
+                self._build_indexes()
             return True
         except Exception as e:
             print(f"Error clearing data: {e}")
@@ -130,26 +576,151 @@ class GoogleSheetsService:
 
     def save_changes(self) -> bool:
         """
-        Save all changes from the in-memory DataFrame to the worksheet
+        Save all changes from the in-memory DataFrame. With a mirror the
+        changes are written to the mirror and pushed to the worksheet later by
+        sync_changes; without one they are pushed to the worksheet right away.
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if self.mirror is None:
+            return self.sync_changes()
+        try:
+            with self._lock:
+                self._merge_pending_rows()
+                self._write_mirror()
+            return True
+        except Exception as e:
+            print(f"Error saving changes to mirror: {e}")
+            return False
+
+    def sync_changes(self) -> bool:
+        """
+        Push all changes from the in-memory DataFrame to the worksheet.
+        In delta mode only the updated rows are pushed, as one batched range
+        update, and new rows are appended. The whole worksheet is rewritten
+        in full mode or when the columns changed or rows were removed.
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            set_with_dataframe(self.worksheet, self._df)
+            with self._push_lock:
+                # Only the snapshot is taken under the lock; readers and
+                # writers go on while it is pushed
+                with self._lock:
+                    self._merge_pending_rows()
+                    if not self.has_unsynced_changes():
+                        return True
+                    # The mirror must never be behind the worksheet
+                    self._write_mirror()
+                    snapshot = self._take_push_snapshot()
+                self._push_snapshot(snapshot)
+                with self._lock:
+                    self._mark_pushed(snapshot)
+                    if self.mirror is not None:
+                        self.mirror.mark_synced(self.worksheet_name, self._mirrored_columns, self._sync_state())
             return True
         except Exception as e:
             print(f"Error saving changes to worksheet: {e}")
             return False
 
-    def reload_data(self) -> bool:
+    def _take_push_snapshot(self) -> Dict[str, Any]:
         """
-        Reload data from the worksheet into the in-memory DataFrame
+        Take the changes since the last push, to be written to the worksheet
+        without holding the lock. The dirty rows move to the snapshot, so rows
+        updated while it is pushed are dirty again for the next push.
+        Returns:
+            Dict with the row count, columns and values to push
+        """
+        snapshot = {
+            'full': self._needs_full_rewrite(),
+            'row_count': len(self._df),
+            'columns': list(self._df.columns)
+        }
+        if snapshot['full']:
+            # Published versions are never modified in place
+            snapshot['df'] = self._df
+        else:
+            snapshot['ranges'] = self._dirty_ranges()
+            snapshot['next_row'] = self._next_sheet_row()
+            snapshot['appended'] = self._row_values(self._saved_row_count, len(self._df))
+        self._pushing_rows = self._dirty_rows
+        self._dirty_rows = set()
+        return snapshot
+
+    def _push_snapshot(self, snapshot: Dict[str, Any]):
+        """Write a push snapshot to the worksheet; its rows are dirty again if it fails"""
+        self._push_count += 1
+        try:
+            if snapshot['full']:
+                self.backend.write_dataframe(self.worksheet_name, snapshot['df'])
+                return
+            if snapshot['ranges']:
+                self.backend.update_ranges(self.worksheet_name, snapshot['ranges'])
+            if snapshot['appended']:
+                self.backend.append_rows(self.worksheet_name, snapshot['next_row'], snapshot['appended'])
+        except Exception:
+            with self._lock:
+                self._dirty_rows |= self._pushing_rows
+                self._pushing_rows = set()
+            raise
+
+    def _mark_pushed(self, snapshot: Dict[str, Any]):
+        """Record a pushed snapshot as the state persisted in the worksheet"""
+        if snapshot['full']:
+            # The DataFrame is now written contiguously from row 2
+            self._sheet_rows = []
+        self._mark_saved(snapshot['row_count'], snapshot['columns'])
+
+    def _push_changes(self):
+        """Write the changes since the last push to the worksheet, holding the lock throughout"""
+        snapshot = self._take_push_snapshot()
+        self._push_snapshot(snapshot)
+        self._mark_pushed(snapshot)
+
+    def push_count(self) -> int:
+        """Get the number of times changes were pushed to the worksheet"""
+        return self._push_count
+
+    def sheet_values(self) -> List[List[Any]]:
+        """
+        Render the rows last pushed to the worksheet as worksheet values,
+        header included, with empty rows where the worksheet has gaps
+        Returns:
+            List of rows of cell values
+        """
+        with self._lock:
+            values = [[self.backend.cell_value(column) for column in self._saved_columns]]
+            rows = self._row_values(0, self._saved_row_count)
+            for sheet_row, row in zip(self._sheet_rows, rows):
+                values.extend([] for _ in range(sheet_row - len(values) - 1))
+                values.append(row)
+            return values
+
+    def reload_data(self, values: List[List[Any]] = None) -> bool:
+        """
+        Reload data from the worksheet into the in-memory DataFrame, discarding
+        unsaved changes. With a mirror, changes already saved to it are pushed
+        to the worksheet first so they are not lost.
+        Args:
+            values: Worksheet values already downloaded, fetched if omitted
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            self._df = self._load_dataframe()
+            with self._push_lock, self._lock:
+                if self.mirror is not None:
+                    if self.has_changes():
+                        self._clear_pending_rows()
+                        self._set_mirrored_dataframe(self.mirror.load(self.worksheet_name))
+                    if self.has_unsynced_changes():
+                        self._push_changes()
+                        # Values fetched before the push are outdated
+                        values = None
+                self._set_loaded_dataframe(self._load_dataframe(values))
+                self._clear_pending_rows()
+                self._write_mirror(replace=True)
+                self._build_indexes()
             return True
         except Exception as e:
             print(f"Error reloading data: {e}")
-            return False 
\ No newline at end of file
+            return False
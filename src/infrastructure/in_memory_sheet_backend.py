@@ -0,0 +1,127 @@
+import copy
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Optional, List, Dict, Any
+import pandas as pd
+from gspread.utils import a1_to_rowcol
+from .sheet_backend import SheetBackend
+
+class InMemorySheetBackend(SheetBackend):
+    """
+    Local stand-in for a Google spreadsheet, for load tests and benchmarks.
+    Worksheets are kept in memory and optionally persisted to a JSON file.
+    Every call can be slowed down to mimic the Sheets API round trip.
+    """
+
+    def __init__(self, worksheets: Optional[Dict[str, List[List[Any]]]] = None, file_path: Optional[str] = None,
+                 latency: float = 0.0, latency_per_cell: float = 0.0, jitter: float = 0.0):
+        """
+        Initialize the in-memory backend
+        Args:
+            worksheets: Initial values by worksheet name, the first row being the header
+            file_path: Optional JSON file the worksheets are loaded from, if it
+                exists, and written to after every change
+            latency: Seconds added to every call
+            latency_per_cell: Seconds added for every cell read or written
+            jitter: Maximum random seconds added to every call
+        """
+        self.file_path = file_path
+        self.latency = latency
+        self.latency_per_cell = latency_per_cell
+        self.jitter = jitter
+        self._lock = Lock()
+        self._worksheets = copy.deepcopy(worksheets) if worksheets else {}
+        if file_path and os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                self._worksheets = json.load(f)
+        self._touch()
+
+    def _simulate_latency(self, cells: int):
+        """Sleep as long as the Sheets API would take for a call touching that many cells"""
+        delay = self.latency + cells * self.latency_per_cell
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _touch(self):
+        """Update the modification time and persist the worksheets"""
+        self._modified_time = datetime.now(timezone.utc).isoformat()
+        if self.file_path:
+            with open(self.file_path, 'w', encoding='utf-8') as f:
+                json.dump(self._worksheets, f, ensure_ascii=False)
+
+    @staticmethod
+    def _count_cells(values: List[List[Any]]) -> int:
+        return sum(len(row) for row in values)
+
+    def _trimmed(self, worksheet_name: str) -> List[List[Any]]:
+        """Get a copy of a worksheet without trailing empty rows, as the API returns it"""
+        rows = self._worksheets.get(worksheet_name, [])
+        last = len(rows)
+        while last > 0 and not any(value != "" for value in rows[last - 1]):
+            last -= 1
+        return [list(row) for row in rows[:last]]
+
+    def _set_row(self, worksheet_name: str, row: int, values: List[Any], col: int = 1):
+        """Write values into a 1-based row, growing the worksheet as needed"""
+        rows = self._worksheets.setdefault(worksheet_name, [])
+        while len(rows) < row:
+            rows.append([])
+        target = rows[row - 1]
+        end = col - 1 + len(values)
+        if len(target) < end:
+            target.extend([""] * (end - len(target)))
+        target[col - 1:end] = values
+
+    def get_values(self, worksheet_name: str) -> List[List[Any]]:
+        with self._lock:
+            values = self._trimmed(worksheet_name)
+        self._simulate_latency(self._count_cells(values))
+        return values
+
+    def batch_get_values(self, worksheet_names: List[str]) -> Dict[str, List[List[Any]]]:
+        with self._lock:
+            values = {name: self._trimmed(name) for name in worksheet_names}
+        self._simulate_latency(sum(self._count_cells(rows) for rows in values.values()))
+        return values
+
+    def update_ranges(self, worksheet_name: str, ranges: List[Dict[str, Any]]):
+        self._simulate_latency(sum(self._count_cells(r['values']) for r in ranges))
+        with self._lock:
+            for r in ranges:
+                start_row, start_col = a1_to_rowcol(r['range'].split(':')[0])
+                for offset, row_values in enumerate(r['values']):
+                    self._set_row(worksheet_name, start_row + offset, list(row_values), start_col)
+            self._touch()
+
+    def append_rows(self, worksheet_name: str, start_row: int, values: List[List[Any]]):
+        self._simulate_latency(self._count_cells(values))
+        with self._lock:
+            # Like values.append, never overwrite existing data
+            row = max(start_row, len(self._trimmed(worksheet_name)) + 1)
+            for offset, row_values in enumerate(values):
+                self._set_row(worksheet_name, row + offset, list(row_values))
+            self._touch()
+
+    def write_dataframe(self, worksheet_name: str, df: pd.DataFrame):
+        rows = [[self.cell_value(column) for column in df.columns]]
+        rows.extend(
+            [self.cell_value(value) for value in row]
+            for row in df.to_numpy('object')
+        )
+        self._simulate_latency(self._count_cells(rows))
+        with self._lock:
+            # Like set_with_dataframe, rows below the DataFrame are left untouched
+            for offset, row_values in enumerate(rows):
+                self._set_row(worksheet_name, offset + 1, row_values)
+            self._touch()
+
+    def get_modified_time(self) -> str:
+        self._simulate_latency(0)
+        with self._lock:
+            return self._modified_time
@@ -0,0 +1,154 @@
+from threading import Thread, Lock
+from queue import Queue
+from datetime import datetime
+from typing import Optional, Dict, Any, Callable
+import uuid
+
+class Job:
+    # Job statuses
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+    def __init__(self, job_id: str, counters: Optional[Dict[str, Any]] = None):
+        """
+        Initialize a background job
+        Args:
+            job_id: Unique ID of the job
+            counters: Optional initial progress counters
+        """
+        self.job_id = job_id
+        self.status = self.QUEUED
+        self.counters = dict(counters or {})
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now().strftime(self.DATE_FORMAT)
+        self.finished_at = None
+        self._lock = Lock()
+
+    def increment(self, counter: str, amount: int = 1):
+        """Add to a progress counter"""
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def set(self, counter: str, value: Any):
+        """Set a progress counter or status field"""
+        with self._lock:
+            self.counters[counter] = value
+
+    def start(self):
+        with self._lock:
+            self.status = self.RUNNING
+
+    def complete(self, result: Any = None):
+        self._finish(self.COMPLETED, result=result)
+
+    def fail(self, error: str):
+        self._finish(self.FAILED, error=error)
+
+    def _finish(self, status: str, result: Any = None, error: Optional[str] = None):
+        with self._lock:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = datetime.now().strftime(self.DATE_FORMAT)
+
+    def is_finished(self) -> bool:
+        return self.status in (self.COMPLETED, self.FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get a JSON serializable view of the job"""
+        with self._lock:
+            return {
+                'job_id': self.job_id,
+                'status': self.status,
+                'progress': dict(self.counters),
+                'result': self.result,
+                'error': self.error,
+                'created_at': self.created_at,
+                'finished_at': self.finished_at
+            }
+
+class JobQueue:
+    """
+    Runs long tasks, such as processing an uploaded file, on background
+    worker threads and keeps their status so it can be polled by ID
+    """
+
+    # Finished jobs kept for status polling
+    MAX_FINISHED_JOBS = 100
+
+    def __init__(self, workers: int = 1):
+        """
+        Initialize the job queue
+        Args:
+            workers: Number of worker threads. A single worker runs the jobs
+                one after another, in the order they were submitted
+        """
+        self.job_queue = Queue()
+        self._jobs = {}
+        self._lock = Lock()
+
+        self.worker_threads = [Thread(target=self.job_consumer, daemon=True) for _ in range(workers)]
+        for worker_thread in self.worker_threads:
+            worker_thread.start()
+
+    def job_consumer(self):
+        while True:
+            job, target, args = self.job_queue.get()  # Blocks until a job is available
+            if job is None:
+                break
+
+            job.start()
+            try:
+                job.complete(target(job, *args))
+            except Exception as e:
+                print(f"Error running job {job.job_id}: {str(e)}")
+                job.fail(str(e))
+
+            self._prune_finished_jobs()
+            self.job_queue.task_done()
+
+    def submit(self, target: Callable[..., Any], *args, counters: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Queue a job
+        Args:
+            target: Function run as target(job, *args); its return value
+                becomes the job result
+            counters: Optional initial progress counters of the job
+        Returns:
+            str: The ID of the job
+        """
+        job = Job(uuid.uuid4().hex, counters)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self.job_queue.put((job, target, args))
+        return job.job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the status of a job
+        Args:
+            job_id: The ID of the job
+        Returns:
+            Optional[Dict]: Status, progress counters and result of the job, None if unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.to_dict() if job is not None else None
+
+    def _prune_finished_jobs(self):
+        """Forget the oldest finished jobs beyond MAX_FINISHED_JOBS"""
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.is_finished()]
+            for job_id in finished[:max(0, len(finished) - self.MAX_FINISHED_JOBS)]:
+                del self._jobs[job_id]
+
+    def stop(self):
+        for _ in self.worker_threads:
+            self.job_queue.put((None, None, None))
+        for worker_thread in self.worker_threads:
+            worker_thread.join()
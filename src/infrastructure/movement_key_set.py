@@ -0,0 +1,86 @@
+from threading import Lock
+from typing import Iterable
+import numpy as np
+import pandas as pd
+
+class MovementKeySet:
+    """
+    Set of the movement numbers already ingested, kept as a sorted int64
+    array so a whole column of keys is checked with one binary search. The
+    array is replaced rather than modified, so lookups read it without
+    locking.
+    """
+
+    def __init__(self):
+        """Initialize an empty key set"""
+        self._lock = Lock()
+        self._keys = np.empty(0, dtype='int64')
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @staticmethod
+    def _to_array(keys: Iterable) -> np.ndarray:
+        """Get the non-missing keys as an int64 array"""
+        try:
+            keys = pd.array(keys, dtype='Int64')
+        except (TypeError, ValueError):
+            # Values that aren't integers can't be movement numbers
+            numbers = pd.to_numeric(pd.Series(list(keys), dtype=object), errors='coerce')
+            keys = pd.array(numbers.where(numbers == np.trunc(numbers)), dtype='Int64')
+        return keys[~keys.isna()].to_numpy('int64')
+
+    @staticmethod
+    def _isin(values: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        if len(keys) == 0:
+            return np.zeros(len(values), dtype=bool)
+        # Searching sorted values walks the keys in order, which is cache friendly
+        order = np.argsort(values, kind='stable')
+        sorted_values = values[order]
+        positions = np.searchsorted(keys, sorted_values).clip(max=len(keys) - 1)
+        found = np.empty(len(values), dtype=bool)
+        found[order] = keys[positions] == sorted_values
+        return found
+
+    def contains(self, keys: Iterable) -> np.ndarray:
+        """
+        Check which keys are in the set
+        Args:
+            keys: Movement numbers, possibly with missing values
+        Returns:
+            np.ndarray: Boolean mask aligned with keys; missing keys are never in the set
+        """
+        keys = pd.array(keys, dtype='Int64')
+        missing = keys.isna()
+        found = np.zeros(len(keys), dtype=bool)
+        found[~missing] = self._isin(keys[~missing].to_numpy('int64'), self._keys)
+        return found
+
+    def add(self, keys: Iterable) -> int:
+        """
+        Add keys to the set
+        Args:
+            keys: Movement numbers, possibly with missing values
+        Returns:
+            int: Number of keys added
+        """
+        keys = self._to_array(keys)
+        with self._lock:
+            new_keys = np.unique(keys[~self._isin(keys, self._keys)])
+            if len(new_keys) == 0:
+                return 0
+            merged = np.concatenate([self._keys, new_keys])
+            merged.sort(kind='mergesort')
+            self._keys = merged
+            return len(new_keys)
+
+    def replace(self, keys: Iterable):
+        """
+        Replace the whole set with the given keys, for example the movement
+        numbers of a freshly loaded sheet
+        Args:
+            keys: Movement numbers, possibly with missing values
+        """
+        keys = np.unique(self._to_array(keys))
+        with self._lock:
+            self._keys = keys
@@ -0,0 +1,61 @@
+from threading import Lock
+from typing import Optional, List
+import time
+
+class TokenBucket:
+    """Bucket that refills at a fixed rate up to its capacity"""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize the bucket full
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens, the largest allowed burst
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self) -> float:
+        """Seconds until the bucket has a whole token"""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+class TokenBucketRateLimiter:
+    """
+    Rate limiter shared by several threads, with a token bucket per limit
+    (for example per second and per minute). A call is allowed when every
+    bucket has a token, so callers only wait as long as the limits require.
+    """
+
+    def __init__(self, per_second: Optional[float] = None, per_minute: Optional[float] = None):
+        """
+        Initialize the rate limiter
+        Args:
+            per_second: Maximum calls per second, unlimited if omitted
+            per_minute: Maximum calls per minute, unlimited if omitted
+        """
+        self.buckets: List[TokenBucket] = []
+        if per_second:
+            self.buckets.append(TokenBucket(per_second, max(1.0, per_second)))
+        if per_minute:
+            self.buckets.append(TokenBucket(per_minute / 60, max(1.0, per_minute)))
+        self._lock = Lock()
+
+    def acquire(self):
+        """Block until a call is allowed by every limit and take a token from each bucket"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                for bucket in self.buckets:
+                    bucket.refill(now)
+                wait = max((bucket.wait_time() for bucket in self.buckets), default=0.0)
+                if wait == 0.0:
+                    for bucket in self.buckets:
+                        bucket.tokens -= 1
+                    return
+            time.sleep(wait)
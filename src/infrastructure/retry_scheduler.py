@@ -0,0 +1,84 @@
+from threading import Thread, Condition
+from typing import Any, Callable
+import heapq
+import itertools
+import random
+import time
+
+class RetryScheduler:
+    """
+    Holds failed items out of the work queue until their next attempt is
+    due. Items are kept in a heap ordered by due time, and a single thread
+    releases each one back to the work queue when its delay is over, so
+    workers never sleep on a failure.
+    """
+
+    BASE_DELAY = 2
+    MAX_DELAY = 60
+
+    def __init__(self, release: Callable[[Any], None], base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY):
+        """
+        Initialize the retry scheduler
+        Args:
+            release: Function called with each item when its retry is due,
+                for example the put method of the work queue
+            base_delay: Seconds before the first retry, doubled on each attempt
+            max_delay: Maximum seconds between attempts
+        """
+        self.release = release
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._heap = []
+        # Breaks ties between items due at the same time, which aren't comparable
+        self._sequence = itertools.count()
+        self._condition = Condition()
+        self._stopped = False
+
+        self.scheduler_thread = Thread(target=self.scheduler_loop, daemon=True)
+        self.scheduler_thread.start()
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Get the delay before a retry: exponential in the number of attempts,
+        capped, with random jitter so items that failed together don't retry together
+        Args:
+            attempt: Number of the retry, starting at 1
+        Returns:
+            float: Seconds to wait
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+    def schedule(self, item: Any, attempt: int):
+        """Release an item after the backoff delay of its attempt"""
+        due_at = time.monotonic() + self.backoff(attempt)
+        with self._condition:
+            heapq.heappush(self._heap, (due_at, next(self._sequence), item))
+            # Wake the thread in case this item is due before the one it waits for
+            self._condition.notify()
+
+    def pending_count(self) -> int:
+        with self._condition:
+            return len(self._heap)
+
+    def scheduler_loop(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    now = time.monotonic()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    self._condition.wait(self._heap[0][0] - now if self._heap else None)
+                if self._stopped:
+                    return
+                _, _, item = heapq.heappop(self._heap)
+            try:
+                self.release(item)
+            except Exception as e:
+                print(f"Error releasing retry: {str(e)}")
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self.scheduler_thread.join()
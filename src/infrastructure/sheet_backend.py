@@ -0,0 +1,155 @@
+from abc import ABC, abstractmethod
+from numbers import Real
+from typing import List, Dict, Any
+import pandas as pd
+import gspread
+from gspread.utils import rowcol_to_a1, absolute_range_name
+from gspread_dataframe import set_with_dataframe
+from google.oauth2.service_account import Credentials
+
+class SheetBackend(ABC):
+    """
+    Storage used by GoogleSheetsService to read and write worksheet values.
+    Values are lists of rows, the first row being the header, with rows
+    numbered from 1 as in the spreadsheet.
+    """
+
+    @staticmethod
+    def cell_value(value: Any) -> Any:
+        """
+        Convert a DataFrame value into a value accepted by the Sheets API,
+        matching the representation used by set_with_dataframe
+        """
+        if pd.isnull(value) is True:
+            return ""
+        if isinstance(value, Real):
+            return value.item() if hasattr(value, 'item') else value
+        return str(value)
+
+    @abstractmethod
+    def get_values(self, worksheet_name: str) -> List[List[Any]]:
+        """
+        Get the values of a worksheet
+        Args:
+            worksheet_name: Name of the worksheet
+        Returns:
+            List of rows, the first one being the header
+        """
+
+    @abstractmethod
+    def batch_get_values(self, worksheet_names: List[str]) -> Dict[str, List[List[Any]]]:
+        """
+        Get the values of several worksheets in a single request
+        Args:
+            worksheet_names: Names of the worksheets
+        Returns:
+            Dict mapping each worksheet name to its values
+        """
+
+    @abstractmethod
+    def update_ranges(self, worksheet_name: str, ranges: List[Dict[str, Any]]):
+        """
+        Write several A1 ranges of a worksheet in a single request
+        Args:
+            worksheet_name: Name of the worksheet
+            ranges: List of {'range', 'values'} dictionaries
+        """
+
+    @abstractmethod
+    def append_rows(self, worksheet_name: str, start_row: int, values: List[List[Any]]):
+        """
+        Append rows after the data of a worksheet
+        Args:
+            worksheet_name: Name of the worksheet
+            start_row: First empty row after the data
+            values: Rows to append
+        """
+
+    @abstractmethod
+    def write_dataframe(self, worksheet_name: str, df: pd.DataFrame):
+        """
+        Write a whole DataFrame, with its header, from the top of a worksheet
+        Args:
+            worksheet_name: Name of the worksheet
+            df: DataFrame to write
+        """
+
+    @abstractmethod
+    def get_modified_time(self) -> str:
+        """
+        Get the last modification time of the spreadsheet
+        Returns:
+            str: Modification time, changing whenever any worksheet changes
+        """
+
+class GspreadSheetBackend(SheetBackend):
+    """Google Sheets storage accessed through gspread"""
+
+    SCOPES = [
+        'https://www.googleapis.com/auth/spreadsheets',
+        'https://www.googleapis.com/auth/drive'
+    ]
+
+    # Values are read as get_as_dataframe does: formulas unevaluated, dates formatted
+    VALUES_GET_PARAMS = {
+        'valueRenderOption': 'FORMULA',
+        'dateTimeRenderOption': 'FORMATTED_STRING'
+    }
+
+    def __init__(self, service_account_file: str, sheet_id: str):
+        """
+        Authorize a client and open the spreadsheet, so it can be shared by
+        several GoogleSheetsService instances
+        Args:
+            service_account_file: Path to the service account JSON file
+            sheet_id: ID of the Google Sheet
+        """
+        self.service_account_file = service_account_file
+        self.sheet_id = sheet_id
+        credentials = Credentials.from_service_account_file(
+            service_account_file,
+            scopes=self.SCOPES
+        )
+        gc = gspread.authorize(credentials)
+        self.spreadsheet = gc.open_by_key(sheet_id)
+        self._worksheets = None
+
+    def _worksheet(self, worksheet_name: str) -> gspread.Worksheet:
+        """Get a worksheet handle, listing all worksheets with a single metadata call"""
+        if self._worksheets is None:
+            self._worksheets = {worksheet.title: worksheet for worksheet in self.spreadsheet.worksheets()}
+        return self._worksheets[worksheet_name]
+
+    def get_values(self, worksheet_name: str) -> List[List[Any]]:
+        response = self.spreadsheet.values_get(
+            absolute_range_name(worksheet_name),
+            params=self.VALUES_GET_PARAMS
+        )
+        return response.get('values', [])
+
+    def batch_get_values(self, worksheet_names: List[str]) -> Dict[str, List[List[Any]]]:
+        response = self.spreadsheet.values_batch_get(
+            [absolute_range_name(name) for name in worksheet_names],
+            params=self.VALUES_GET_PARAMS
+        )
+        value_ranges = response.get('valueRanges', [])
+        return {
+            name: value_range.get('values', [])
+            for name, value_range in zip(worksheet_names, value_ranges)
+        }
+
+    def update_ranges(self, worksheet_name: str, ranges: List[Dict[str, Any]]):
+        self._worksheet(worksheet_name).batch_update(ranges, value_input_option='USER_ENTERED')
+
+    def append_rows(self, worksheet_name: str, start_row: int, values: List[List[Any]]):
+        self._worksheet(worksheet_name).append_rows(
+            values,
+            value_input_option='USER_ENTERED',
+            table_range=rowcol_to_a1(start_row, 1)
+        )
+
+    def write_dataframe(self, worksheet_name: str, df: pd.DataFrame):
+        set_with_dataframe(self._worksheet(worksheet_name), df)
+
+    def get_modified_time(self) -> str:
+        return self.spreadsheet.get_lastUpdateTime()
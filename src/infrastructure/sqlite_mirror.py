@@ -0,0 +1,162 @@
+import json
+import sqlite3
+from numbers import Real
+from threading import Lock
+from typing import Optional, List, Dict, Any, Iterable
+import pandas as pd
+
+class SQLiteMirror:
+    """
+    Local SQLite copy of spreadsheet worksheets. Each worksheet keeps its rows
+    as JSON documents plus the state needed to resume syncing to Google Sheets
+    after a restart: the columns and row count last pushed to the sheet, the
+    sheet row of every pushed row and which of those rows changed since.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the SQLite mirror
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        # The connection is shared by the worksheets and the sync thread, one
+        # transaction at a time
+        self._lock = Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS worksheets (
+                    name TEXT PRIMARY KEY,
+                    columns TEXT NOT NULL,
+                    synced_columns TEXT NOT NULL,
+                    synced_row_count INTEGER NOT NULL,
+                    sheet_rows TEXT NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS rows (
+                    worksheet TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    dirty INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (worksheet, position)
+                )
+            """)
+            self._conn.commit()
+
+    @staticmethod
+    def _json_value(value: Any) -> Any:
+        """Convert a DataFrame value into a JSON serializable value"""
+        if pd.isnull(value) is True:
+            return None
+        if isinstance(value, Real):
+            return value.item() if hasattr(value, 'item') else value
+        return str(value)
+
+    def _row_documents(self, df: pd.DataFrame, positions: Iterable[int], dirty_rows: set) -> List[tuple]:
+        """Serialize DataFrame rows into (position, dirty, data) tuples"""
+        positions = list(positions)
+        rows = df.iloc[positions].to_numpy('object')
+        return [
+            (position, int(position in dirty_rows), json.dumps([self._json_value(value) for value in row]))
+            for position, row in zip(positions, rows)
+        ]
+
+    def worksheet_names(self) -> List[str]:
+        """
+        Get the names of the worksheets stored in the mirror
+        Returns:
+            List of worksheet names
+        """
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT name FROM worksheets").fetchall()]
+
+    def load(self, worksheet_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a worksheet from the mirror
+        Args:
+            worksheet_name: Name of the worksheet
+        Returns:
+            Optional[Dict]: 'dataframe', 'synced_columns', 'synced_row_count',
+            'sheet_rows' and 'dirty_rows' of the worksheet, None if it isn't mirrored
+        """
+        with self._lock:
+            meta = self._conn.execute(
+                "SELECT columns, synced_columns, synced_row_count, sheet_rows FROM worksheets WHERE name = ?",
+                (worksheet_name,)
+            ).fetchone()
+            if meta is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT position, dirty, data FROM rows WHERE worksheet = ? ORDER BY position",
+                (worksheet_name,)
+            ).fetchall()
+
+        columns = json.loads(meta[0])
+        return {
+            'dataframe': pd.DataFrame([json.loads(row[2]) for row in rows], columns=columns),
+            'synced_columns': json.loads(meta[1]),
+            'synced_row_count': meta[2],
+            'sheet_rows': json.loads(meta[3]),
+            'dirty_rows': {row[0] for row in rows if row[1]}
+        }
+
+    def write(self, worksheet_name: str, df: pd.DataFrame, positions: Optional[Iterable[int]], sync_state: Dict[str, Any]):
+        """
+        Write worksheet rows and sync state to the mirror in one transaction
+        Args:
+            worksheet_name: Name of the worksheet
+            df: The in-memory DataFrame of the worksheet
+            positions: Row positions to write, None to replace all rows
+            sync_state: 'synced_columns', 'synced_row_count', 'sheet_rows' and
+                'dirty_rows' of the worksheet
+        """
+        replace = positions is None
+        rows = self._row_documents(df, range(len(df)) if replace else positions, sync_state['dirty_rows'])
+        # The connection commits on success and rolls back on error
+        with self._lock, self._conn:
+            if replace:
+                self._conn.execute("DELETE FROM rows WHERE worksheet = ?", (worksheet_name,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO rows (worksheet, position, dirty, data) VALUES (?, ?, ?, ?)",
+                [(worksheet_name,) + row for row in rows]
+            )
+            self._write_sync_state(worksheet_name, list(df.columns), sync_state)
+
+    def mark_synced(self, worksheet_name: str, columns: List[str], sync_state: Dict[str, Any]):
+        """
+        Record that the worksheet rows were pushed to Google Sheets
+        Args:
+            worksheet_name: Name of the worksheet
+            columns: Columns of the in-memory DataFrame
+            sync_state: Sync state of the worksheet after the push, whose
+                dirty rows changed since the pushed snapshot was taken
+        """
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE rows SET dirty = 0 WHERE worksheet = ?", (worksheet_name,))
+            # Rows changed while the push was in flight still have to be pushed
+            self._conn.executemany(
+                "UPDATE rows SET dirty = 1 WHERE worksheet = ? AND position = ?",
+                [(worksheet_name, position) for position in sorted(sync_state['dirty_rows'])]
+            )
+            self._write_sync_state(worksheet_name, columns, sync_state)
+
+    def _write_sync_state(self, worksheet_name: str, columns: List[str], sync_state: Dict[str, Any]):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO worksheets (name, columns, synced_columns, synced_row_count, sheet_rows) VALUES (?, ?, ?, ?, ?)",
+            (
+                worksheet_name,
+                json.dumps([str(column) for column in columns]),
+                json.dumps([str(column) for column in sync_state['synced_columns']]),
+                sync_state['synced_row_count'],
+                json.dumps(sync_state['sheet_rows'])
+            )
+        )
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._conn.close()
@@ -1,27 +1,28 @@
 import os
-from typing import Optional, Dict, Any
+import math
+import time
+import atexit
+from numbers import Real
+from threading import Thread, Event, Condition, Lock
+from typing import Optional, List, Dict, Any, Callable
 import pandas as pd
+import xxhash
 from .google_sheets_service import GoogleSheetsService
+from .sheet_backend import SheetBackend, GspreadSheetBackend
+from .sqlite_mirror import SQLiteMirror
+from .movement_key_set import MovementKeySet
+from .column_schema import ColumnSchema
 from .worksheets.transactions_worksheet import TransactionsWorksheet
 from .worksheets.email_history_worksheet import EmailHistoryWorksheet
 from .worksheets.whatsapp_history_worksheet import WhatsAppHistoryWorksheet
 from .worksheets.states_worksheet import StatesWorksheet
 
-def parse_number(value):
-    if isinstance(value, str):
-        # Remove thousands separator and replace decimal comma with dot
-        value = value.replace('.', '').replace(',', '.')
-    try:
-        return float(value)
-    except ValueError:
-        return None  # or handle the error as needed
-
 class TransactionSheetService:
     # Default column definitions
     TRANSACTIONS_COLUMNS = [
         'Fecha', 'Concepto', 'N° Movimiento', 'Referencia', 'Monto',
         'QUERY', 'CORREO', 'TELEFONO', 'REMITENTE', 'ESTADO DE REMEDIACION',
-        'EMAIL ID', 'WP ID', 'ARCHIVO'
+        'EMAIL ID', 'WP ID', 'ARCHIVO', 'ESTADO WP'
     ]
     
     EMAIL_HISTORY_COLUMNS = [
@@ -32,50 +33,116 @@ class TransactionSheetService:
         'Fecha', 'N° Movimiento', 'WP ID', 'Mensaje'
     ]
 
-    CONVERTERS = {
-        'Fecha': str,
-        'Concepto': str,
-        'N° Movimiento': int,
-        'Referencia': str,
-        'Monto': parse_number,
-        'QUERY': str,
-        'CORREO': str,
-        'TELEFONO': str,
-        'REMITENTE': str,
-        'ESTADO DE REMEDIACION': str,
-        'EMAIL ID': str,
-        'WP ID': str,
-        'ARCHIVO': str
-    }
+    # Column types of the transactions, shared by sheet loads and file parsing
+    SCHEMA = ColumnSchema({
+        'Fecha': ColumnSchema.STRING,
+        'Concepto': ColumnSchema.CATEGORY,
+        'N° Movimiento': ColumnSchema.INTEGER,
+        'Referencia': ColumnSchema.STRING,
+        'Monto': ColumnSchema.NUMBER,
+        'QUERY': ColumnSchema.CATEGORY,
+        'CORREO': ColumnSchema.STRING,
+        'TELEFONO': ColumnSchema.STRING,
+        'REMITENTE': ColumnSchema.STRING,
+        'ESTADO DE REMEDIACION': ColumnSchema.CATEGORY,
+        'EMAIL ID': ColumnSchema.STRING,
+        'WP ID': ColumnSchema.STRING,
+        'ARCHIVO': ColumnSchema.STRING,
+        'ESTADO WP': ColumnSchema.CATEGORY
+    })
+
+    # Worksheet names
+    TRANSACTIONS_WORKSHEET = 'Transacciones'
+    EMAIL_HISTORY_WORKSHEET = 'Historial_Correos'
+    WHATSAPP_HISTORY_WORKSHEET = 'Historial_WP'
+    STATES_WORKSHEET = 'Estados'
+    WORKSHEET_NAMES = [
+        TRANSACTIONS_WORKSHEET, EMAIL_HISTORY_WORKSHEET,
+        WHATSAPP_HISTORY_WORKSHEET, STATES_WORKSHEET
+    ]
 
     # Constants
     DATE_FORMAT = '%d/%m/%Y %H:%M:%S'
+    # Seconds during which the spreadsheet is assumed unchanged after a freshness check
+    DEFAULT_STALENESS_TTL = 5
+    # Seconds between background pushes of the mirror to Google Sheets
+    DEFAULT_SYNC_INTERVAL = 10
+    # Seconds between coalesced flushes of scheduled saves
+    DEFAULT_FLUSH_INTERVAL = 5
+    # Changed rows that trigger a scheduled flush before the interval ends
+    DEFAULT_FLUSH_THRESHOLD = 500
 
-    def __init__(self, service_account_file: str, sheet_id: str):
+    def __init__(self, service_account_file: str, sheet_id: str, staleness_ttl: float = DEFAULT_STALENESS_TTL, mirror_path: Optional[str] = None, sync_interval: float = DEFAULT_SYNC_INTERVAL, backend: Optional[SheetBackend] = None, flush_interval: float = DEFAULT_FLUSH_INTERVAL, flush_threshold: int = DEFAULT_FLUSH_THRESHOLD):
         """
         Initialize the Transaction Sheet Service with multiple worksheets
         Args:
             service_account_file: Path to the service account JSON file
             sheet_id: ID of the Google Sheet
+            staleness_ttl: Seconds during which reload_all_data trusts the last
+                freshness check instead of asking Drive for the modified time
+            mirror_path: Optional path of a local SQLite mirror. When set, the
+                worksheets are loaded from and saved to the mirror, and a
+                background thread pushes the saved changes to Google Sheets
+            sync_interval: Seconds between background pushes when mirroring
+            backend: Optional storage for the worksheets, for example an
+                InMemorySheetBackend for load tests; defaults to the Google Sheet
+            flush_interval: Seconds between coalesced flushes of the saves
+                requested with schedule_save
+            flush_threshold: Number of changed rows that triggers a scheduled
+                flush before the interval ends
         """
         self.service_account_file = service_account_file
         self.sheet_id = sheet_id
-        
+        self.staleness_ttl = staleness_ttl
+        self.sync_interval = sync_interval
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.mirror = SQLiteMirror(mirror_path) if mirror_path else None
+
+        # Authorize once and share the spreadsheet handle between worksheets
+        self.backend = backend if backend is not None else GspreadSheetBackend(service_account_file, sheet_id)
+        # Download the worksheets missing from the mirror in a single round trip
+        mirrored = set(self.mirror.worksheet_names()) if self.mirror is not None else set()
+        names = [name for name in self.WORKSHEET_NAMES if name not in mirrored]
+        # Mirrored worksheets may be behind the sheet, so the first reload checks it
+        self._modified_time = self.backend.get_modified_time() if not mirrored else None
+        self._checked_at = time.monotonic()
+        values = self.backend.batch_get_values(names) if names else {}
+        self._values_hashes = {name: self._hash_values(worksheet_values) for name, worksheet_values in values.items()}
+        # Worksheets we pushed to since they were loaded; their values hash is
+        # computed from the in-memory rows only when the spreadsheet changes
+        self._pushed_worksheets = set()
+        self._push_lock = Lock()
+
+        # Movement numbers already ingested, used to find duplicate uploads.
+        # Added transactions are recorded as they are added, and the set is
+        # rebuilt from the worksheet whenever it is loaded
+        self.movement_keys = MovementKeySet()
+
         # Initialize services for each worksheet
         self.transactions = TransactionsWorksheet(
             GoogleSheetsService(
                 service_account_file=service_account_file,
                 sheet_id=sheet_id,
-                worksheet_name='Transacciones',
-                converters=self.CONVERTERS
-            )
+                worksheet_name=self.TRANSACTIONS_WORKSHEET,
+                schema=self.SCHEMA,
+                index_columns=TransactionsWorksheet.INDEX_COLUMNS,
+                backend=self.backend,
+                values=values.get(self.TRANSACTIONS_WORKSHEET),
+                mirror=self.mirror
+            ),
+            movement_keys=self.movement_keys
         )
         
         self.email_history = EmailHistoryWorksheet(
             GoogleSheetsService(
                 service_account_file=service_account_file,
                 sheet_id=sheet_id,
-                worksheet_name='Historial_Correos'
+                worksheet_name=self.EMAIL_HISTORY_WORKSHEET,
+                index_columns=EmailHistoryWorksheet.INDEX_COLUMNS,
+                backend=self.backend,
+                values=values.get(self.EMAIL_HISTORY_WORKSHEET),
+                mirror=self.mirror
             )
         )
         
@@ -83,7 +150,11 @@ class TransactionSheetService:
             GoogleSheetsService(
                 service_account_file=service_account_file,
                 sheet_id=sheet_id,
-                worksheet_name='Historial_WP'
+                worksheet_name=self.WHATSAPP_HISTORY_WORKSHEET,
+                index_columns=WhatsAppHistoryWorksheet.INDEX_COLUMNS,
+                backend=self.backend,
+                values=values.get(self.WHATSAPP_HISTORY_WORKSHEET),
+                mirror=self.mirror
             )
         )
         
@@ -91,10 +162,165 @@ class TransactionSheetService:
             GoogleSheetsService(
                 service_account_file=service_account_file,
                 sheet_id=sheet_id,
-                worksheet_name='Estados'
+                worksheet_name=self.STATES_WORKSHEET,
+                backend=self.backend,
+                values=values.get(self.STATES_WORKSHEET),
+                mirror=self.mirror
             )
         )
 
+        self._rebuild_movement_keys()
+
+        # Worksheets with a scheduled save, flushed together by the flush thread
+        self._scheduled_saves = set()
+        self._flush_condition = Condition()
+        self._closed = False
+        self.flush_thread = Thread(target=self._flush_loop, daemon=True)
+        self.flush_thread.start()
+
+        if self.mirror is not None:
+            self._sync_stop = Event()
+            self.sync_thread = Thread(target=self._sync_loop, daemon=True)
+            self.sync_thread.start()
+
+        # Flush whatever is still pending when the process exits
+        atexit.register(self.close)
+
+    def _flush_loop(self):
+        """Save the scheduled worksheets once per interval, or sooner past the threshold"""
+        while True:
+            with self._flush_condition:
+                self._flush_condition.wait(self.flush_interval)
+                if self._closed:
+                    return
+            self._flush_scheduled()
+
+    def _flush_scheduled(self) -> bool:
+        """
+        Save the worksheets with a scheduled save. Worksheets that fail to
+        save are scheduled again for the next flush.
+        Returns:
+            bool: True if all saves were successful, False otherwise
+        """
+        with self._flush_condition:
+            names = [name for name in self.WORKSHEET_NAMES if name in self._scheduled_saves]
+            self._scheduled_saves.clear()
+
+        worksheets = self._worksheets()
+        if self.mirror is None:
+            failed = self._track_pushes(lambda: [name for name in names if not worksheets[name].save_changes()])
+        else:
+            failed = [name for name in names if not worksheets[name].save_changes()]
+        if failed:
+            with self._flush_condition:
+                self._scheduled_saves.update(failed)
+        return not failed
+
+    def _sync_loop(self):
+        """Push the changes saved to the mirror to Google Sheets periodically"""
+        while not self._sync_stop.wait(self.sync_interval):
+            self.sync_all_changes()
+
+    @staticmethod
+    def _normalize_cell(value: Any) -> str:
+        """
+        Render a cell the same way whether it was downloaded or rendered from
+        a DataFrame. The API returns the numbers USER_ENTERED parsed out of
+        the pushed strings, and DataFrames may hold 5.0 where the API has 5.
+        """
+        if isinstance(value, bool):
+            return str(value).upper()
+        if isinstance(value, str):
+            try:
+                number = float(value)
+            except ValueError:
+                return value
+        elif isinstance(value, Real):
+            number = float(value)
+        else:
+            return str(value)
+        if not math.isfinite(number):
+            return str(value)
+        return str(int(number)) if number.is_integer() else repr(number)
+
+    @classmethod
+    def _hash_values(cls, values: List[List[Any]]) -> int:
+        """
+        Fingerprint the values of a worksheet. Cells are normalized first and
+        trailing empty cells and rows are left out, since the API omits them
+        and local renderings may not.
+        """
+        rows = []
+        for row in values:
+            row = [cls._normalize_cell(value) for value in row]
+            end = len(row)
+            while end > 0 and row[end - 1] == "":
+                end -= 1
+            rows.append(row[:end])
+        while rows and not rows[-1]:
+            rows.pop()
+        return xxhash.xxh3_64_intdigest(repr(rows).encode('utf-8'))
+
+    def _track_pushes(self, push: Callable[[], Any]) -> Any:
+        """
+        Run a save that may push changes to the spreadsheet and, if it did,
+        record the modified time it left behind, so the next reload doesn't
+        take our own writes for changes made by others. Changes made by others
+        before the push keep the spreadsheet stale.
+        Args:
+            push: Function doing the save
+        Returns:
+            The result of push
+        """
+        worksheets = self._worksheets()
+        if not any(worksheet.has_unsynced_changes() for worksheet in worksheets.values()):
+            return push()
+        with self._push_lock:
+            fresh = self._modified_time is not None and self.backend.get_modified_time() == self._modified_time
+            push_counts = {name: worksheet.push_count() for name, worksheet in worksheets.items()}
+            result = push()
+            pushed = [name for name, worksheet in worksheets.items() if worksheet.push_count() != push_counts[name]]
+            if fresh and pushed:
+                self._modified_time = self.backend.get_modified_time()
+                self._checked_at = time.monotonic()
+                self._pushed_worksheets.update(pushed)
+            return result
+
+    def _rebuild_movement_keys(self):
+        """
+        Rebuild the key set from the movement numbers of the transactions
+        worksheet, so rows deleted or renumbered in the sheet are forgotten
+        """
+        transactions_df = self.transactions.read_all()
+        if 'N° Movimiento' in transactions_df.columns:
+            self.movement_keys.replace(transactions_df['N° Movimiento'])
+        else:
+            self.movement_keys.replace([])
+
+    def _worksheets(self) -> Dict[str, Any]:
+        """Get the worksheet handlers by worksheet name"""
+        return {
+            self.TRANSACTIONS_WORKSHEET: self.transactions,
+            self.EMAIL_HISTORY_WORKSHEET: self.email_history,
+            self.WHATSAPP_HISTORY_WORKSHEET: self.whatsapp_history,
+            self.STATES_WORKSHEET: self.states
+        }
+
+    def _check_modified_time(self) -> Optional[str]:
+        """
+        Ask Drive for the spreadsheet modified time, unless the last check is
+        younger than the staleness TTL
+        Returns:
+            Optional[str]: The new modified time if the spreadsheet changed
+            remotely since it was last loaded, None otherwise
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.staleness_ttl:
+            return None
+        modified_time = self.backend.get_modified_time()
+        self._checked_at = now
+        return modified_time if modified_time != self._modified_time else None
+
     def add_email_message(self, email_id: str, message: str) -> bool:
         """
         Add a new message to the email history
@@ -152,39 +378,122 @@ class TransactionSheetService:
             bool: True if all saves were successful, False otherwise
         """
         try:
-            transactions_saved = self.transactions.save_changes()
-            email_history_saved = self.email_history.save_changes()
-            whatsapp_history_saved = self.whatsapp_history.save_changes()
-            states_saved = self.states.save_changes()
-            
-            return all([
-                transactions_saved,
-                email_history_saved,
-                whatsapp_history_saved,
-                states_saved
-            ])
+            return self._track_pushes(lambda: all([
+                self.transactions.save_changes(),
+                self.email_history.save_changes(),
+                self.whatsapp_history.save_changes(),
+                self.states.save_changes()
+            ]))
         except Exception as e:
             print(f"Error saving changes: {e}")
             return False
 
-    def reload_all_data(self) -> bool:
+    def schedule_save(self, worksheet_names: Optional[List[str]] = None):
+        """
+        Mark worksheets as needing a save. Scheduled saves are coalesced and
+        written by the flush thread once per flush interval, or as soon as the
+        changed rows reach the flush threshold.
+        Args:
+            worksheet_names: Worksheets to save, all of them if omitted
+        """
+        worksheets = self._worksheets()
+        with self._flush_condition:
+            self._scheduled_saves.update(worksheet_names or self.WORKSHEET_NAMES)
+            changed_rows = sum(worksheets[name].change_count() for name in self._scheduled_saves)
+            if changed_rows >= self.flush_threshold:
+                self._flush_condition.notify()
+
+    def flush(self) -> bool:
+        """
+        Save the scheduled worksheets right away and, with a mirror, push
+        them to Google Sheets. Meant for paths that need the data persisted
+        before going on.
+        Returns:
+            bool: True if all saves were successful, False otherwise
+        """
+        flushed = self._flush_scheduled()
+        if self.mirror is not None:
+            flushed = self.sync_all_changes() and flushed
+        return flushed
+
+    def sync_all_changes(self) -> bool:
+        """
+        Push the saved changes of all worksheets to Google Sheets. Without a
+        mirror, changes are pushed on save and there is nothing to sync.
+        Returns:
+            bool: True if all pushes were successful, False otherwise
+        """
+        try:
+            return self._track_pushes(lambda: all([worksheet.sync_changes() for worksheet in self._worksheets().values()]))
+        except Exception as e:
+            print(f"Error syncing changes: {e}")
+            return False
+
+    def close(self):
+        """Stop the background threads, flush the pending changes and close the mirror"""
+        with self._flush_condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._flush_condition.notify()
+        self.flush_thread.join()
+        self._flush_scheduled()
+
+        if self.mirror is None:
+            return
+        self._sync_stop.set()
+        self.sync_thread.join()
+        self.sync_all_changes()
+        self.mirror.close()
+
+    def reload_all_data(self, force: bool = False) -> bool:
         """
-        Reload all data from all worksheets
+        Reload the worksheets that changed since they were last loaded.
+        Drive only reports the modified time of the whole spreadsheet, so when
+        it changed all worksheets are downloaded with a single batchGet call and
+        only those whose values differ are parsed again. Worksheets with unsaved
+        local changes are always reloaded.
+        Args:
+            force: Reload every worksheet without checking for changes
         Returns:
             bool: True if all reloads were successful, False otherwise
         """
         try:
-            transactions_reloaded = self.transactions.reload_data()
-            email_history_reloaded = self.email_history.reload_data()
-            whatsapp_history_reloaded = self.whatsapp_history.reload_data()
-            states_reloaded = self.states.reload_data()
-            
-            return all([
-                transactions_reloaded,
-                email_history_reloaded,
-                whatsapp_history_reloaded,
-                states_reloaded
-            ])
+            # Scheduled saves must not be discarded by the reload
+            self.flush()
+            worksheets = self._worksheets()
+            if force:
+                modified_time = self.backend.get_modified_time()
+                self._checked_at = time.monotonic()
+            else:
+                modified_time = self._check_modified_time()
+            if force or modified_time is not None:
+                names = self.WORKSHEET_NAMES
+            else:
+                names = [name for name, worksheet in worksheets.items() if worksheet.has_changes()]
+            if not names:
+                return True
+
+            values = self.backend.batch_get_values(names)
+            reloaded = []
+            for name in names:
+                values_hash = self._hash_values(values[name])
+                worksheet = worksheets[name]
+                if name in self._pushed_worksheets:
+                    # What we pushed is what the worksheet holds unless someone else changed it
+                    self._pushed_worksheets.discard(name)
+                    self._values_hashes[name] = self._hash_values(worksheet.sheet_values())
+                if not force and values_hash == self._values_hashes.get(name) and not worksheet.has_changes():
+                    continue
+                reloaded.append(worksheet.reload_data(values[name]))
+                self._values_hashes[name] = values_hash
+                # The sheet is the source of truth for the movements already ingested
+                if name == self.TRANSACTIONS_WORKSHEET:
+                    self._rebuild_movement_keys()
+
+            if modified_time is not None:
+                self._modified_time = modified_time
+            return all(reloaded)
         except Exception as e:
             print(f"Error reloading data: {e}")
             return False
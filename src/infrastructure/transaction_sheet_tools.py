@@ -137,7 +137,7 @@ class TransactionSheetTools:
         # Tool 5: Update the remediation status of a transaction
         class UpdateStateInput(BaseModel):
             movement_number: int = Field(..., description="N° Movimiento of the transaction.")
-            new_status: str = Field(..., description="New ESTADO DE REMEDIACION value [No Procesado, En Proceso, Respuesta Invalida 1, Respuesta Invalida 2, Procesamiento Manual, Completado].")
+            new_status: str = Field(..., description="New ESTADO DE REMEDIACION value [No Procesado, En Proceso, Respuesta Invalida 1, Respuesta Invalida 2, Procesamiento Manual, Completado, Envio Fallido].")
 
         def update_state_func(input: UpdateStateInput) -> str:
             """Update the remediation status of a transaction."""
@@ -146,12 +146,15 @@ class TransactionSheetTools:
 
         update_state_tool = StructuredTool.from_function(update_state_func)
         update_state_tool.name = "update_transaction_status"
-        update_state_tool.description = "Update a transaction's ESTADO DE REMEDIACION (remediation status). Provide movement_number and new_status [No Procesado, En Proceso, Respuesta Invalida 1, Respuesta Invalida 2, Procesamiento Manual, Completado]."
+        update_state_tool.description = "Update a transaction's ESTADO DE REMEDIACION (remediation status). Provide movement_number and new_status [No Procesado, En Proceso, Respuesta Invalida 1, Respuesta Invalida 2, Procesamiento Manual, Completado, Envio Fallido]."
 
         # Tool 6: Save changes to the sheet (no input)
         def save_changes_func(_=None) -> str:
             """Save all changes to the Google Sheet."""
-            self.transaction_service.transactions.save_changes()
+            # The agent is told the changes were saved, so they are flushed right away
+            self.transaction_service.schedule_save([self.transaction_service.TRANSACTIONS_WORKSHEET])
+            if not self.transaction_service.flush():
+                return "Failed to save the changes to the Google Sheet."
             return "All changes have been saved to the Google Sheet."
 
         save_tool = Tool(
@@ -163,7 +166,9 @@ class TransactionSheetTools:
         # Tool 7: Reload data from the sheet (no input)
         def reload_data_func(_=None) -> str:
             """Reload data from the Google Sheet."""
-            self.transaction_service.transactions.reload_data()
+            # Scheduled saves are flushed before the worksheets are reloaded
+            if not self.transaction_service.reload_all_data(force=True):
+                return "Failed to reload data from the Google Sheet."
             return "Data has been reloaded from the Google Sheet."
         
         reload_data_tool = Tool(
@@ -0,0 +1,76 @@
+from typing import Optional, Iterator, BinaryIO, Union
+import pandas as pd
+import filetype
+from .column_schema import ColumnSchema
+from .xlsx_parser import XLSXParser
+from .delimited_text_parser import DelimitedTextParser
+
+class UploadParser:
+    """
+    Parses uploaded transaction files, telling their type apart from their
+    content rather than their name: Excel workbooks go to XLSXParser, and
+    CSV or TSV files, plain or gzip/zstd compressed, to DelimitedTextParser
+    """
+
+    # Rows per DataFrame yielded by iter_chunks
+    DEFAULT_CHUNK_SIZE = XLSXParser.DEFAULT_CHUNK_SIZE
+
+    # File types
+    XLSX = 'xlsx'
+    TEXT = 'text'
+
+    # Extensions of the files taken from zip archives
+    EXTENSIONS = ('.xlsx', '.csv', '.tsv', '.gz', '.zst')
+
+    @staticmethod
+    def file_type(file: Union[str, BinaryIO]) -> str:
+        """
+        Sniff the type of a file from its first bytes
+        Args:
+            file: Path or seekable binary file; its position is kept
+        Returns:
+            str: XLSX, TEXT, DelimitedTextParser.GZIP or DelimitedTextParser.ZSTD
+        Raises:
+            ValueError: If the file is of an unsupported type
+        """
+        kind = filetype.guess(file)
+        if kind is None:
+            # Plain text has no signature, but binary files have NUL bytes
+            head = filetype.utils.get_bytes(file)
+            if b'\x00' in head:
+                raise ValueError("Unsupported file type")
+            return UploadParser.TEXT
+        if kind.extension in (UploadParser.XLSX, DelimitedTextParser.GZIP, DelimitedTextParser.ZSTD):
+            return kind.extension
+        raise ValueError(f"Unsupported file type: {kind.mime}")
+
+    @staticmethod
+    def read_file(file: Union[str, BinaryIO], schema: Optional[ColumnSchema] = None) -> pd.DataFrame:
+        # Read a file of any supported type and return a DataFrame
+        file_type = UploadParser.file_type(file)
+        if file_type == UploadParser.XLSX:
+            return XLSXParser.read_file(file, schema=schema)
+        compression = None if file_type == UploadParser.TEXT else file_type
+        return DelimitedTextParser.read_file(file, compression=compression, schema=schema)
+
+    @staticmethod
+    def iter_chunks(file: Union[str, BinaryIO], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    schema: Optional[ColumnSchema] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream a file of any supported type as DataFrames of at most chunk_size rows
+        Args:
+            file: Path or seekable binary file
+            chunk_size: Maximum number of rows per DataFrame
+            schema: Optional column types applied to every chunk
+        Yields:
+            DataFrame chunks with the columns of the header row
+        """
+        file_type = UploadParser.file_type(file)
+        if file_type == UploadParser.XLSX:
+            return XLSXParser.iter_chunks(file, chunk_size=chunk_size, schema=schema)
+        compression = None if file_type == UploadParser.TEXT else file_type
+        return DelimitedTextParser.iter_chunks(file, chunk_size=chunk_size, schema=schema, compression=compression)
+
+    @staticmethod
+    def new_rows(new_df: pd.DataFrame, current_df: pd.DataFrame, key_column: str) -> pd.DataFrame:
+        return XLSXParser.new_rows(new_df, current_df, key_column)
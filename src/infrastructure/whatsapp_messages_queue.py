@@ -1,45 +1,105 @@
 from threading import Thread
 from queue import Queue
-import time
+from typing import Optional, List, Tuple, Callable
+from .rate_limiter import TokenBucketRateLimiter
+from .whatsapp_outbox import WhatsAppOutbox
+from .retry_scheduler import RetryScheduler
 
 class WhatsappMessagesQueue:
 
     MAX_RETRIES = 3
-    CALL_DELAY = 2
-    
-    def __init__(self, whatsapp_service):
+    WORKERS = 2
+    # Sends allowed by the provider, shared by all the workers
+    RATE_PER_SECOND = 0.5
+    RATE_PER_MINUTE = 30
+
+    def __init__(self, whatsapp_service, workers: int = WORKERS, rate_per_second: float = RATE_PER_SECOND, rate_per_minute: float = RATE_PER_MINUTE, outbox_path: Optional[str] = None, on_delivery: Optional[Callable[[str, bool], None]] = None):
+        """
+        Initialize the WhatsApp messages queue
+        Args:
+            whatsapp_service: WhatsAppService used to send the messages
+            workers: Number of consumer threads sending messages
+            rate_per_second: Maximum messages sent per second, unlimited if 0
+            rate_per_minute: Maximum messages sent per minute, unlimited if 0
+            outbox_path: Optional SQLite file the queued messages are kept in
+                until they are sent, so they survive a restart; the messages
+                are only kept in memory when omitted
+            on_delivery: Optional callback called as on_delivery(wp_id, sent)
+                when a message is sent, or fails for the last time
+        """
         self.whatsapp_service = whatsapp_service
+        self.on_delivery = on_delivery
         self.message_queue = Queue()
-        
-        self.consumer_thread = Thread(target=self.message_consumer, daemon=True)
-        self.consumer_thread.start()
+        # Consumers only wait for the rate limit, never a fixed delay
+        self.rate_limiter = TokenBucketRateLimiter(per_second=rate_per_second, per_minute=rate_per_minute)
+        self.outbox = WhatsAppOutbox(outbox_path)
+        # Failed messages wait here for their backoff, out of the way of fresh ones
+        self.retry_scheduler = RetryScheduler(self.message_queue.put)
+
+        # Messages a previous run didn't finish sending go first
+        for queued_message in self.outbox.recover():
+            self.message_queue.put(queued_message)
+
+        self.consumer_threads = [Thread(target=self.message_consumer, daemon=True) for _ in range(workers)]
+        for consumer_thread in self.consumer_threads:
+            consumer_thread.start()
 
     def message_consumer(self):
         while True:
-            cellphone, message, wp_id, retry_count = self.message_queue.get()  # Blocks until a message is available
-            if message == "STOP":
+            message_id, cellphone, message, wp_id, retry_count = self.message_queue.get()  # Blocks until a message is available
+            if message_id is None:
                 break
 
+            self.rate_limiter.acquire()
             sended = False
             try:
                 sended = self.whatsapp_service.send_message(cellphone, message)
             except Exception as e:
                 print(f"Error sending message to {cellphone}: {str(e)}", end="")
 
-            if(not sended and retry_count < self.MAX_RETRIES):
-                self.put_message(cellphone, message, wp_id, retry_count + 1)
-                print("Retrying...")
-            elif(not sended and retry_count >= self.MAX_RETRIES):
-                print("Max retries reached")
-            else:
-                print(f"Message sent successfully to {cellphone}-{wp_id}")
+            try:
+                if(not sended and retry_count < self.MAX_RETRIES):
+                    self.outbox.retry(message_id, retry_count + 1)
+                    self.retry_scheduler.schedule((message_id, cellphone, message, wp_id, retry_count + 1), retry_count + 1)
+                    print("Retrying...")
+                elif(not sended and retry_count >= self.MAX_RETRIES):
+                    self.outbox.fail(message_id)
+                    print("Max retries reached")
+                    self._report_delivery(wp_id, False)
+                else:
+                    # Acknowledged only once sent, so a crash before this sends it again
+                    self.outbox.ack(message_id)
+                    print(f"Message sent successfully to {cellphone}-{wp_id}")
+                    self._report_delivery(wp_id, True)
+            except Exception as e:
+                print(f"Error updating the outbox for message {wp_id}: {str(e)}")
 
             self.message_queue.task_done()
-            time.sleep(self.CALL_DELAY)
 
-    def put_message(self, cellphone, message, wp_id, retry_count = 0):
-        self.message_queue.put((cellphone, message, wp_id, retry_count))
+    def _report_delivery(self, wp_id, sent):
+        if self.on_delivery is None:
+            return
+        try:
+            self.on_delivery(wp_id, sent)
+        except Exception as e:
+            print(f"Error reporting delivery of message {wp_id}: {str(e)}")
+
+    def put_message(self, cellphone, message, wp_id):
+        self.put_messages([(cellphone, message, wp_id)])
+
+    def put_messages(self, messages: List[Tuple[str, str, str]]):
+        """
+        Queue several messages, stored in the outbox in a single transaction
+        Args:
+            messages: List of (cellphone, message, wp_id) tuples
+        """
+        for queued_message in self.outbox.enqueue_many(messages):
+            self.message_queue.put(queued_message)
 
     def stop(self):
-        self.message_queue.add_message("", "STOP")
-        self.consumer_thread.join()
\ No newline at end of file
+        self.retry_scheduler.stop()
+        for _ in self.consumer_threads:
+            self.message_queue.put((None, None, None, None, None))
+        for consumer_thread in self.consumer_threads:
+            consumer_thread.join()
+        self.outbox.close()
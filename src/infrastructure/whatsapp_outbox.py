@@ -0,0 +1,108 @@
+import os
+import sqlite3
+from datetime import datetime
+from threading import Lock
+from typing import Optional, List, Tuple
+
+class WhatsAppOutbox:
+    """
+    Durable store of the WhatsApp messages waiting to be sent, in SQLite with
+    write-ahead logging. A message stays in the outbox until its send is
+    acknowledged, so messages pending or in flight when the process stops
+    are sent again on the next start (at-least-once delivery).
+    """
+
+    # Message statuses; messages are pending until they are sent
+    PENDING = 'pending'
+    FAILED = 'failed'
+
+    DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the outbox
+        Args:
+            db_path: Path to the SQLite database file; the outbox is only kept
+                in memory when omitted
+        """
+        self.db_path = db_path or ':memory:'
+        if db_path and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # The connection is shared by the consumer threads, one statement at a time
+        self._lock = Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # Commits are durable once checkpointed, without an fsync each
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    cellphone TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    wp_id TEXT,
+                    retry_count INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS messages_status ON messages (status, id)")
+            self._conn.commit()
+
+    def enqueue_many(self, messages: List[Tuple[str, str, str]]) -> List[Tuple[int, str, str, str, int]]:
+        """
+        Store several messages in a single transaction
+        Args:
+            messages: List of (cellphone, message, wp_id) tuples
+        Returns:
+            List of (message_id, cellphone, message, wp_id, retry_count) tuples, in order
+        """
+        created_at = datetime.now().strftime(self.DATE_FORMAT)
+        stored = []
+        with self._lock, self._conn:
+            for cellphone, message, wp_id in messages:
+                cursor = self._conn.execute(
+                    "INSERT INTO messages (cellphone, message, wp_id, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (cellphone, message, wp_id, self.PENDING, created_at)
+                )
+                stored.append((cursor.lastrowid, cellphone, message, wp_id, 0))
+        return stored
+
+    def recover(self) -> List[Tuple[int, str, str, str, int]]:
+        """
+        Get the messages a previous run didn't finish sending, queued or in
+        flight, in the order they were enqueued
+        Returns:
+            List of (message_id, cellphone, message, wp_id, retry_count) tuples
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, cellphone, message, wp_id, retry_count FROM messages WHERE status = ? ORDER BY id",
+                (self.PENDING,)
+            ).fetchall()
+
+    def ack(self, message_id: int):
+        """Remove a message that was sent"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE id = ?", (message_id,))
+
+    def retry(self, message_id: int, retry_count: int):
+        """Record a failed attempt of a message that will be sent again"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE messages SET retry_count = ? WHERE id = ?", (retry_count, message_id))
+
+    def fail(self, message_id: int):
+        """Keep a message that ran out of retries, without sending it again"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE messages SET status = ? WHERE id = ?", (self.FAILED, message_id))
+
+    def count(self, status: str) -> int:
+        """Get the number of messages with a status"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages WHERE status = ?", (status,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,13 +1,36 @@
 import os
+import asyncio
 import requests
-from typing import Optional
+import httpx
+from requests.adapters import HTTPAdapter
+from typing import Optional, List, Tuple
 
 class WhatsAppService:
+    # Seconds to open a connection and to wait for a response
+    CONNECT_TIMEOUT = 5
+    READ_TIMEOUT = 30
+    # Keep-alive connections kept open to the provider
+    POOL_SIZE = 10
+    # Messages sent at once by send_many
+    MAX_CONCURRENCY = 10
+
     def __init__(self):
         self.api_key = os.getenv("WASENDER_API_KEY")
         self.phone_id = os.getenv("WASENDER_PHONE_ID")
             
         self.base_url = "https://www.wasenderapi.com/api"
+        self.timeout = (self.CONNECT_TIMEOUT, self.READ_TIMEOUT)
+
+        # Reuse connections between messages instead of a TLS handshake each
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=self.POOL_SIZE))
+        self.session.headers.update(self._headers())
+
+    def _headers(self) -> dict:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
 
     def send_message(self, to: str, message: str) -> bool:
         """
@@ -22,23 +45,53 @@ class WhatsAppService:
             return False
             
         url = f"{self.base_url}/send-message"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
         payload = {
             "to": to,
             "text": message
         }
         
         try:
-            response = requests.post(url, headers=headers, json=payload)
+            response = self.session.post(url, json=payload, timeout=self.timeout)
             response.raise_for_status()
             return True
         except Exception as e:
             print(f"Error sending WhatsApp message: {e}")
             return False
 
+    async def send_many(self, messages: List[Tuple[str, str]], max_concurrency: int = MAX_CONCURRENCY) -> List[bool]:
+        """
+        Send several messages concurrently over one async connection pool,
+        for example with asyncio.run(whatsapp_service.send_many(messages))
+        Args:
+            messages: List of (to, message) tuples
+            max_concurrency: Maximum number of messages sent at once
+        Returns:
+            List[bool]: Whether each message was sent successfully, in order
+        """
+        if not self.api_key:
+            return [False] * len(messages)
+
+        url = f"{self.base_url}/send-message"
+        semaphore = asyncio.Semaphore(max_concurrency)
+        limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        timeout = httpx.Timeout(self.READ_TIMEOUT, connect=self.CONNECT_TIMEOUT)
+
+        async with httpx.AsyncClient(headers=self._headers(), limits=limits, timeout=timeout) as client:
+            async def send(to: str, message: str) -> bool:
+                async with semaphore:
+                    try:
+                        response = await client.post(url, json={"to": to, "text": message})
+                        response.raise_for_status()
+                        return True
+                    except Exception as e:
+                        print(f"Error sending WhatsApp message to {to}: {e}")
+                        return False
+
+            return list(await asyncio.gather(*(send(to, message) for to, message in messages)))
+
+    def close(self):
+        self.session.close()
+
     def process_incoming_message(self, webhook_data: dict) -> Optional[tuple]:
         """
         Process incoming webhook data from WhatsApp
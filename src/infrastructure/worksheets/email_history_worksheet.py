@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any
+from typing import Optional, List, Tuple, Dict, Any
 import pandas as pd
 from datetime import datetime
 from ..google_sheets_service import GoogleSheetsService
@@ -9,6 +9,9 @@ class EmailHistoryWorksheet:
         'Fecha', 'N° Movimiento', 'EMAIL ID', 'Mensaje'
     ]
 
+    # Key columns indexed for constant-time lookups
+    INDEX_COLUMNS = ['EMAIL ID']
+
     # Constants
     DATE_FORMAT = '%d/%m/%Y %H:%M:%S'
 
@@ -35,6 +38,10 @@ class EmailHistoryWorksheet:
         """Add a new email record"""
         return self.service.add_row(email_data)
 
+    def add_many(self, emails_data: List[Dict[str, Any]]) -> bool:
+        """Add several new email records at once"""
+        return self.service.add_rows(emails_data)
+
     def find(self, column_name: str, value: Any) -> Optional[pd.DataFrame]:
         """Find email records matching the search criteria"""
         return self.service.find_row(column_name, value)
@@ -65,6 +72,29 @@ class EmailHistoryWorksheet:
             print(f"Error adding email message: {e}")
             return False
 
+    def add_messages(self, messages: List[Tuple[str, str, int]]) -> bool:
+        """
+        Add several messages to the email history at once
+        Args:
+            messages: List of (EMAIL ID, message, N° Movimiento) tuples
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            date = datetime.now().strftime(self.DATE_FORMAT)
+            return self.add_many([
+                {
+                    'Fecha': date,
+                    'N° Movimiento': movement_number,
+                    'EMAIL ID': email_id,
+                    'Mensaje': message
+                }
+                for email_id, message, movement_number in messages
+            ])
+        except Exception as e:
+            print(f"Error adding email messages: {e}")
+            return False
+
     def clear(self) -> bool:
         """Clear all data from the worksheet"""
         return self.service.clear_data()
@@ -73,6 +103,30 @@ class EmailHistoryWorksheet:
         """Save changes to the worksheet"""
         return self.service.save_changes()
 
-    def reload_data(self) -> bool:
-        """Reload data from the worksheet"""
-        return self.service.reload_data() 
\ No newline at end of file
+    def sync_changes(self) -> bool:
+        """Push saved changes to the worksheet when a local mirror is used"""
+        return self.service.sync_changes()
+
+    def change_count(self) -> int:
+        """Count the rows changed or added since the last save"""
+        return self.service.change_count()
+
+    def has_changes(self) -> bool:
+        """Check whether there are changes not yet saved"""
+        return self.service.has_changes()
+
+    def has_unsynced_changes(self) -> bool:
+        """Check whether there are changes not yet pushed to the worksheet"""
+        return self.service.has_unsynced_changes()
+
+    def push_count(self) -> int:
+        """Get the number of times changes were pushed to the worksheet"""
+        return self.service.push_count()
+
+    def sheet_values(self) -> List[List[Any]]:
+        """Render the rows last pushed to the worksheet as worksheet values"""
+        return self.service.sheet_values()
+
+    def reload_data(self, values: List[List[Any]] = None) -> bool:
+        """Reload data from the worksheet, optionally from values already downloaded"""
+        return self.service.reload_data(values) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any
+from typing import Optional, List, Dict, Any
 import pandas as pd
 from ..google_sheets_service import GoogleSheetsService
 
@@ -15,6 +15,14 @@ class StatesWorksheet:
     RESPUESTA_INVALIDA_2 = 'Respuesta Invalida 2'
     PROCESAMIENTO_MANUAL = 'Procesamiento Manual'
     COMPLETADO = 'Completado'
+    ENVIO_FALLIDO = 'Envio Fallido'
+
+    # States introduced after the worksheet was set up, with their
+    # descriptions; worksheets that already list states but miss these
+    # get them added on start
+    ADDED_STATES = {
+        ENVIO_FALLIDO: 'El mensaje de WhatsApp no se pudo enviar tras agotar los reintentos'
+    }
 
     def __init__(self, service: GoogleSheetsService):
         """
@@ -24,6 +32,7 @@ class StatesWorksheet:
         """
         self.service = service
         self._initialize_columns()
+        self._add_missing_states()
 
     def _initialize_columns(self):
         """Initialize worksheet with default columns if empty"""
@@ -31,6 +40,22 @@ class StatesWorksheet:
             self.service._df = pd.DataFrame(columns=self.COLUMNS)
             self.service.save_changes()
 
+    def _add_missing_states(self):
+        """Add the states of ADDED_STATES the worksheet doesn't have yet"""
+        states_df = self.service.read_all_data()
+        existing = set(states_df['Estado'].dropna()) if 'Estado' in states_df.columns else set()
+        # A new worksheet is left as it is, to be filled with the whole set of states
+        if not existing:
+            return
+        missing = [
+            {'Estado': state, 'Descripción': description}
+            for state, description in self.ADDED_STATES.items()
+            if state not in existing
+        ]
+        if missing:
+            self.add_many(missing)
+            self.service.save_changes()
+
     def read_all(self) -> pd.DataFrame:
         """Read all data from the worksheet"""
         return self.service.read_all_data()
@@ -39,6 +64,10 @@ class StatesWorksheet:
         """Add a new state"""
         return self.service.add_row(state_data)
 
+    def add_many(self, states_data: List[Dict[str, Any]]) -> bool:
+        """Add several new states at once"""
+        return self.service.add_rows(states_data)
+
     def find(self, column_name: str, value: Any) -> Optional[pd.DataFrame]:
         """Find states matching the search criteria"""
         return self.service.find_row(column_name, value)
@@ -55,6 +84,30 @@ class StatesWorksheet:
         """Save changes to the worksheet"""
         return self.service.save_changes()
 
-    def reload_data(self) -> bool:
-        """Reload data from the worksheet"""
-        return self.service.reload_data() 
\ No newline at end of file
+    def sync_changes(self) -> bool:
+        """Push saved changes to the worksheet when a local mirror is used"""
+        return self.service.sync_changes()
+
+    def change_count(self) -> int:
+        """Count the rows changed or added since the last save"""
+        return self.service.change_count()
+
+    def has_changes(self) -> bool:
+        """Check whether there are changes not yet saved"""
+        return self.service.has_changes()
+
+    def has_unsynced_changes(self) -> bool:
+        """Check whether there are changes not yet pushed to the worksheet"""
+        return self.service.has_unsynced_changes()
+
+    def push_count(self) -> int:
+        """Get the number of times changes were pushed to the worksheet"""
+        return self.service.push_count()
+
+    def sheet_values(self) -> List[List[Any]]:
+        """Render the rows last pushed to the worksheet as worksheet values"""
+        return self.service.sheet_values()
+
+    def reload_data(self, values: List[List[Any]] = None) -> bool:
+        """Reload data from the worksheet, optionally from values already downloaded"""
+        return self.service.reload_data(values) 
\ No newline at end of file
@@ -1,22 +1,33 @@
-from typing import Optional, Dict, Any
+from typing import Optional, List, Dict, Any
 import pandas as pd
 from ..google_sheets_service import GoogleSheetsService
+from ..movement_key_set import MovementKeySet
 
 class TransactionsWorksheet:
     # Default column definitions
     COLUMNS = [
         'Fecha', 'Concepto', 'N° Movimiento', 'Referencia', 'Monto',
         'QUERY', 'CORREO', 'TELEFONO', 'REMITENTE', 'ESTADO DE REMEDIACION',
-        'EMAIL ID', 'WP ID', 'ARCHIVO'
+        'EMAIL ID', 'WP ID', 'ARCHIVO', 'ESTADO WP'
     ]
 
-    def __init__(self, service: GoogleSheetsService):
+    # WhatsApp delivery statuses
+    WP_ENVIADO = 'Enviado'
+    WP_FALLIDO = 'Fallido'
+
+    # Key columns indexed for constant-time lookups
+    INDEX_COLUMNS = ['N° Movimiento', 'EMAIL ID', 'WP ID']
+
+    def __init__(self, service: GoogleSheetsService, movement_keys: Optional[MovementKeySet] = None):
         """
         Initialize the Transactions Worksheet handler
         Args:
             service: GoogleSheetsService instance for the worksheet
+            movement_keys: Optional key set the movement numbers of the added
+                transactions are recorded in, whether they were saved yet or not
         """
         self.service = service
+        self.movement_keys = movement_keys
         self._initialize_columns()
 
     def _initialize_columns(self):
@@ -29,9 +40,27 @@ class TransactionsWorksheet:
         """Read all data from the worksheet"""
         return self.service.read_all_data()
 
+    def _record_movements(self, added: bool, movements: Any) -> bool:
+        """Record the movement numbers of transactions that were added"""
+        if added and self.movement_keys is not None:
+            self.movement_keys.add(movements)
+        return added
+
     def add(self, transaction_data: Dict[str, Any]) -> bool:
         """Add a new transaction"""
-        return self.service.add_row(transaction_data)
+        added = self.service.add_row(transaction_data)
+        return self._record_movements(added, [transaction_data.get('N° Movimiento')])
+
+    def add_many(self, transactions_data: List[Dict[str, Any]]) -> bool:
+        """Add several new transactions at once"""
+        added = self.service.add_rows(transactions_data)
+        return self._record_movements(added, [data.get('N° Movimiento') for data in transactions_data])
+
+    def add_dataframe(self, transactions_df: pd.DataFrame) -> bool:
+        """Add the transactions of a DataFrame at once"""
+        added = self.service.add_dataframe(transactions_df)
+        movements = transactions_df['N° Movimiento'] if 'N° Movimiento' in transactions_df.columns else []
+        return self._record_movements(added, movements)
 
     def find(self, column_name: str, value: Any) -> Optional[pd.DataFrame]:
         """Find transactions matching the search criteria"""
@@ -41,6 +70,10 @@ class TransactionsWorksheet:
         """Update a transaction"""
         return self.service.update_row(column_name, search_value, update_data)
 
+    def update_many(self, column_name: str, updates: Dict[Any, Dict[str, Any]]) -> List[Any]:
+        """Update several transactions at once, returning the search values not found"""
+        return self.service.update_rows(column_name, updates)
+
     def update_state(self, movement_number: int, new_state: str) -> bool:
         """
         Update the 'ESTADO DE REMEDIACION' of a transaction
@@ -64,12 +97,39 @@ class TransactionsWorksheet:
 
     def clear(self) -> bool:
         """Clear all data from the worksheet"""
-        return self.service.clear_data()
+        cleared = self.service.clear_data()
+        if cleared and self.movement_keys is not None:
+            self.movement_keys.replace([])
+        return cleared
 
     def save_changes(self) -> bool:
         """Save changes to the worksheet"""
         return self.service.save_changes()
 
-    def reload_data(self) -> bool:
-        """Reload data from the worksheet"""
-        return self.service.reload_data() 
\ No newline at end of file
+    def sync_changes(self) -> bool:
+        """Push saved changes to the worksheet when a local mirror is used"""
+        return self.service.sync_changes()
+
+    def change_count(self) -> int:
+        """Count the rows changed or added since the last save"""
+        return self.service.change_count()
+
+    def has_changes(self) -> bool:
+        """Check whether there are changes not yet saved"""
+        return self.service.has_changes()
+
+    def has_unsynced_changes(self) -> bool:
+        """Check whether there are changes not yet pushed to the worksheet"""
+        return self.service.has_unsynced_changes()
+
+    def push_count(self) -> int:
+        """Get the number of times changes were pushed to the worksheet"""
+        return self.service.push_count()
+
+    def sheet_values(self) -> List[List[Any]]:
+        """Render the rows last pushed to the worksheet as worksheet values"""
+        return self.service.sheet_values()
+
+    def reload_data(self, values: List[List[Any]] = None) -> bool:
+        """Reload data from the worksheet, optionally from values already downloaded"""
+        return self.service.reload_data(values) 
\ No newline at end of file
@@ -1,15 +1,81 @@
 from io import BytesIO
+from typing import Optional, Iterator, BinaryIO, List, Any
 import pandas as pd
+from openpyxl import load_workbook
+from .column_schema import ColumnSchema
 
 class XLSXParser:
+    # Rows per DataFrame yielded by iter_chunks
+    DEFAULT_CHUNK_SIZE = 5000
+
     @staticmethod
-    def read_file(file: BytesIO, converters= None) -> pd.DataFrame:
+    def read_file(file: BytesIO, schema: Optional[ColumnSchema] = None) -> pd.DataFrame:
         # Read the Excel file and return a DataFrame
-        df = pd.read_excel(file, converters=converters)
-        
-        return df
-    
+        if schema is None:
+            return pd.read_excel(file)
+
+        # Keep the raw cell values and convert whole columns with the schema
+        df = pd.read_excel(file, dtype=object)
+        return schema.apply(df)
+
+    @staticmethod
+    def _cell_value(value: Any) -> Any:
+        # Integral floats are read as int, as pd.read_excel does
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+
+    @classmethod
+    def _chunk(cls, rows: List[tuple], columns: List[str], schema: Optional[ColumnSchema]) -> pd.DataFrame:
+        width = len(columns)
+        df = pd.DataFrame(
+            [[cls._cell_value(value) for value in row[:width]] + [None] * (width - len(row)) for row in rows],
+            columns=columns,
+            dtype=object
+        )
+        return schema.apply(df) if schema is not None else df.infer_objects()
+
+    @classmethod
+    def iter_chunks(cls, file: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE, schema: Optional[ColumnSchema] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream the first sheet of an Excel file as DataFrames of at most
+        chunk_size rows. The workbook is opened in read-only mode, so only the
+        rows of the current chunk are held in memory.
+        Args:
+            file: Path or seekable binary file of the workbook
+            chunk_size: Maximum number of rows per DataFrame
+            schema: Optional column types applied to every chunk
+        Yields:
+            DataFrame chunks with the columns of the header row
+        """
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            # Trailing empty header cells are dropped, inner ones named like pd.read_excel does
+            while header and header[-1] is None:
+                header = header[:-1]
+            columns = [
+                str(name) if name is not None else f"Unnamed: {position}"
+                for position, name in enumerate(header)
+            ]
+
+            chunk = []
+            for row in rows:
+                if all(value is None for value in row):
+                    continue
+                chunk.append(row)
+                if len(chunk) == chunk_size:
+                    yield cls._chunk(chunk, columns, schema)
+                    chunk = []
+            if chunk:
+                yield cls._chunk(chunk, columns, schema)
+        finally:
+            workbook.close()
+
     @staticmethod
     def new_rows(new_df: pd.DataFrame, current_df: pd.DataFrame, key_column: str) -> pd.DataFrame:
         # Return the rows that are in the new DataFrame but not in the current DataFrame
-        return new_df[~new_df[key_column].isin(current_df[key_column])]
\ No newline at end of file
+        return new_df[~new_df[key_column].isin(current_df[key_column])]
@@ -0,0 +1,48 @@
+# python -m tests.column_schema_test
+
+
+import pandas as pd
+from src.infrastructure.column_schema import ColumnSchema
+
+schema = ColumnSchema({
+    'Monto': ColumnSchema.NUMBER,
+    'N° Movimiento': ColumnSchema.INTEGER,
+    'Referencia': ColumnSchema.STRING,
+    'QUERY': ColumnSchema.CATEGORY
+})
+
+# Cells keep the type they had in the sheet, as read with dtype=object
+raw_df = pd.DataFrame({
+    'Monto': ['1.234,56', 1500, 2.5, None, 'n/a'],
+    'N° Movimiento': [88268904082, '88268904083', 12.0, None, 'x'],
+    'Referencia': [14732507853, '14732507854', 'ABC', None, 7],
+    'QUERY': [2, '3', 2, None, '2'],
+    'Otra': ['a', 'b', 'c', 'd', 'e']
+}, dtype=object)
+
+converted_df = schema.apply(raw_df)
+print("Converted dtypes:")
+print(converted_df.dtypes)
+print(converted_df)
+
+# Text numbers use '.' thousands separators and ',' decimals; unparseable cells are missing
+print("Monto as expected:", converted_df['Monto'].tolist()[:3] == [1234.56, 1500.0, 2.5] and converted_df['Monto'].iloc[3:].isna().all())
+print("N° Movimiento as expected:", converted_df['N° Movimiento'].tolist()[:3] == [88268904082, 88268904083, 12])
+# Integers above 2**53 are not rounded through float64
+large = schema.apply(pd.DataFrame({'N° Movimiento': [9007199254740993, '9007199254740995', 1.5, None]}, dtype=object))['N° Movimiento']
+print("Large integers kept exact:", large.tolist()[:3] == [9007199254740993, 9007199254740995, 1] and large.isna().iloc[3])
+print("Referencia as expected:", converted_df['Referencia'].tolist()[:3] == ['14732507853', '14732507854', 'ABC'])
+# Integers widened to floats by missing values are written without '.0'
+widened = schema.apply(pd.DataFrame({'Referencia': [14732507853, None]}))['Referencia']
+print("Widened integers as text:", widened.tolist()[0] == '14732507853' and widened.isna().iloc[1])
+print("QUERY categories:", list(converted_df['QUERY'].cat.categories))
+print("Columns outside the schema untouched:", converted_df['Otra'].dtype == object)
+
+# Columns already in their schema dtype are returned as they are
+print("Applying twice is a no-op:", schema.apply(converted_df) is converted_df)
+
+# Concatenated categorical columns stay categorical with the merged categories
+other_df = schema.apply(pd.DataFrame({'QUERY': ['4', '2']}, dtype=object))
+concat_df = schema.concat([converted_df[['QUERY']], other_df])
+print("Concatenated QUERY dtype:", concat_df['QUERY'].dtype)
+print("Concatenated QUERY categories:", list(concat_df['QUERY'].cat.categories))
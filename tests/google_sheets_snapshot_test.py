@@ -0,0 +1,32 @@
+# python -m tests.google_sheets_snapshot_test
+
+
+from src.infrastructure.in_memory_sheet_backend import InMemorySheetBackend
+from src.infrastructure.google_sheets_service import GoogleSheetsService
+
+backend = InMemorySheetBackend(worksheets={
+    'Transacciones': [
+        ['N° Movimiento', 'ESTADO DE REMEDIACION'],
+        [1, 'No procesado'],
+        [2, 'No procesado']
+    ]
+})
+service = GoogleSheetsService('', '', 'Transacciones', backend=backend, index_columns=['N° Movimiento'])
+
+# A reader's snapshot keeps the version it was taken from
+snapshot = service.read_all_data()
+service.update_row('N° Movimiento', 1, {'ESTADO DE REMEDIACION': 'En proceso', 'WP ID': 'wp_1'})
+print("Snapshot states:", snapshot['ESTADO DE REMEDIACION'].tolist())
+print("Snapshot unchanged:", snapshot['ESTADO DE REMEDIACION'].tolist() == ['No procesado', 'No procesado']
+      and 'WP ID' not in snapshot.columns)
+
+# Later reads see the update
+current = service.read_all_data()
+print("Current states:", current['ESTADO DE REMEDIACION'].tolist())
+print("Update visible:", current['ESTADO DE REMEDIACION'].tolist() == ['En proceso', 'No procesado'])
+
+# Rows added later don't show up in earlier snapshots either
+service.add_row({'N° Movimiento': 3, 'ESTADO DE REMEDIACION': 'No procesado'})
+service.update_rows('N° Movimiento', {2: {'ESTADO DE REMEDIACION': 'Resuelto'}})
+print("Snapshot rows:", len(current), "- current rows:", len(service.read_all_data()))
+print("Snapshot unchanged after update_rows:", current['ESTADO DE REMEDIACION'].tolist() == ['En proceso', 'No procesado'])
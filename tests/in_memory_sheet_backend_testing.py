@@ -0,0 +1,81 @@
+# python -m tests.in_memory_sheet_backend_testing
+
+import random
+import time
+from src.infrastructure.in_memory_sheet_backend import InMemorySheetBackend
+from src.infrastructure.transaction_sheet_service import TransactionSheetService
+from src.infrastructure.worksheets.transactions_worksheet import TransactionsWorksheet
+from src.infrastructure.worksheets.email_history_worksheet import EmailHistoryWorksheet
+from src.infrastructure.worksheets.whatsapp_history_worksheet import WhatsAppHistoryWorksheet
+from src.infrastructure.worksheets.states_worksheet import StatesWorksheet
+
+ROWS = 100_000
+QUERIES = 1_000
+
+# Local spreadsheet with Sheets-like latency: ~200ms per call plus 2µs per cell
+backend = InMemorySheetBackend(
+    worksheets={
+        TransactionSheetService.TRANSACTIONS_WORKSHEET: [TransactionsWorksheet.COLUMNS],
+        TransactionSheetService.EMAIL_HISTORY_WORKSHEET: [EmailHistoryWorksheet.COLUMNS],
+        TransactionSheetService.WHATSAPP_HISTORY_WORKSHEET: [WhatsAppHistoryWorksheet.COLUMNS],
+        TransactionSheetService.STATES_WORKSHEET: [StatesWorksheet.COLUMNS],
+    },
+    latency=0.2,
+    latency_per_cell=0.000002,
+    jitter=0.05
+)
+
+start = time.perf_counter()
+transaction_service = TransactionSheetService('', '', backend=backend)
+print(f"Service initialized in {time.perf_counter() - start:.2f}s")
+
+# ===== SECTION 1: INGEST =====
+print("\n=== INGEST ===")
+
+transactions_data = [
+    {
+        'Fecha': '01/01/2025',
+        'Concepto': 'Transferencia',
+        'N° Movimiento': movement_number,
+        'Referencia': f"REF{movement_number}",
+        'Monto': round(random.uniform(1000, 100000), 2),
+        'QUERY': random.choice(['1', '2', '3']),
+        'CORREO': f"usuario{movement_number}@correo.com",
+        'TELEFONO': f"+57300{movement_number:07d}",
+        'REMITENTE': 'Banco A',
+        'ESTADO DE REMEDIACION': StatesWorksheet.NO_PROCESADO,
+        'EMAIL ID': f"email_{movement_number}",
+        'WP ID': f"wp_{movement_number}",
+        'ARCHIVO': 'transactions.xlsx'
+    }
+    for movement_number in range(1, ROWS + 1)
+]
+
+start = time.perf_counter()
+transaction_service.transactions.add_many(transactions_data)
+transaction_service.save_all_changes()
+print(f"Ingested {ROWS} rows in {time.perf_counter() - start:.2f}s")
+
+start = time.perf_counter()
+transaction_service.reload_all_data(force=True)
+print(f"Reloaded all worksheets in {time.perf_counter() - start:.2f}s")
+
+# ===== SECTION 2: AGENT QUERIES =====
+print("\n=== AGENT QUERIES ===")
+
+movement_numbers = random.sample(range(1, ROWS + 1), QUERIES)
+
+start = time.perf_counter()
+for movement_number in movement_numbers:
+    transaction_service.transactions.find('N° Movimiento', movement_number)
+print(f"{QUERIES} finds in {time.perf_counter() - start:.2f}s")
+
+start = time.perf_counter()
+for movement_number in movement_numbers:
+    transaction_service.transactions.update_state(movement_number, StatesWorksheet.EN_PROCESO)
+    transaction_service.add_email_message(f"email_{movement_number}", "Respuesta del cliente")
+print(f"{QUERIES} state updates and email messages in {time.perf_counter() - start:.2f}s")
+
+start = time.perf_counter()
+transaction_service.save_all_changes()
+print(f"Saved changes in {time.perf_counter() - start:.2f}s")
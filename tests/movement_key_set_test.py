@@ -0,0 +1,36 @@
+# python -m tests.movement_key_set_test
+
+
+import pandas as pd
+from src.infrastructure.movement_key_set import MovementKeySet
+from src.infrastructure.in_memory_sheet_backend import InMemorySheetBackend
+from src.infrastructure.transaction_sheet_service import TransactionSheetService
+from src.infrastructure.worksheets.transactions_worksheet import TransactionsWorksheet
+
+# Keys are added once; missing values are ignored
+movement_keys = MovementKeySet()
+added = movement_keys.add(pd.Series([88268904082, 88268904083, None, 88268904082], dtype='Int64'))
+print("Keys added:", added, "- keys in the set:", len(movement_keys))
+print("Adding known keys again adds:", movement_keys.add([88268904083]))
+
+# Lookups return a mask aligned with the keys; missing keys are never in the set
+mask = movement_keys.contains(pd.Series([88268904083, None, 1, 88268904082], dtype='Int64'))
+print("Contains mask:", mask.tolist(), "- as expected:", mask.tolist() == [True, False, False, True])
+
+# Values that aren't integers are ignored
+print("Text keys added:", movement_keys.add(['88268904084', 'abc', 1.5]), "- contains:", movement_keys.contains([88268904084])[0])
+
+# Replacing the set forgets the keys removed from the sheet
+movement_keys.replace([88268904083, 88268904090])
+print("After replace:", movement_keys.contains([88268904082, 88268904083, 88268904090]).tolist())
+
+# The set follows the transactions added by any route, saved or not
+backend = InMemorySheetBackend(worksheets={
+    TransactionSheetService.TRANSACTIONS_WORKSHEET: [TransactionsWorksheet.COLUMNS, ['01/01/2025', 'Cobro', 1]]
+})
+transaction_service = TransactionSheetService('', '', backend=backend)
+print("Loaded keys:", transaction_service.movement_keys.contains([1, 2, 3]).tolist())
+transaction_service.transactions.add({'N° Movimiento': 2, 'Concepto': 'Abono'})
+transaction_service.transactions.add_dataframe(pd.DataFrame({'N° Movimiento': pd.array([3], dtype='Int64')}))
+print("Keys of unsaved transactions:", transaction_service.movement_keys.contains([1, 2, 3]).tolist())
+transaction_service.close()
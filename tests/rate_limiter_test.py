@@ -0,0 +1,55 @@
+# python -m tests.rate_limiter_test
+
+
+import time
+from threading import Thread
+from src.infrastructure.rate_limiter import TokenBucketRateLimiter
+
+# A full bucket allows a burst up to its capacity, then calls are paced at the rate
+rate_limiter = TokenBucketRateLimiter(per_second=10)
+start = time.monotonic()
+call_times = []
+for _ in range(30):
+    rate_limiter.acquire()
+    call_times.append(time.monotonic() - start)
+print(f"30 calls at 10/s took {call_times[-1]:.2f}s (expected about 2.0s)")
+print("Burst of 10 without waiting:", call_times[9] < 0.05)
+gaps = [later - earlier for earlier, later in zip(call_times[10:], call_times[11:])]
+print(f"Gap between paced calls: min {min(gaps):.3f}s, max {max(gaps):.3f}s (expected about 0.1s)")
+
+# The limit is shared by every thread using the limiter
+rate_limiter = TokenBucketRateLimiter(per_second=20)
+thread_counts = [0] * 4
+
+def consumer(index):
+    deadline = time.monotonic() + 2
+    while True:
+        rate_limiter.acquire()
+        if time.monotonic() > deadline:
+            return
+        thread_counts[index] += 1
+
+threads = [Thread(target=consumer, args=(index,)) for index in range(4)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(f"4 threads at 20/s made {sum(thread_counts)} calls in 2s (expected about 60)")
+
+# The strictest limit wins: 5 per minute allows a burst of 5 even at 100 per second
+rate_limiter = TokenBucketRateLimiter(per_second=100, per_minute=5)
+start = time.monotonic()
+for _ in range(5):
+    rate_limiter.acquire()
+print("Burst of 5 within the per minute limit:", time.monotonic() - start < 0.2)
+waiter = Thread(target=rate_limiter.acquire, daemon=True)
+waiter.start()
+waiter.join(1)
+print("Sixth call waits for the per minute bucket:", waiter.is_alive())
+
+# Without limits calls never wait
+rate_limiter = TokenBucketRateLimiter()
+start = time.monotonic()
+for _ in range(1000):
+    rate_limiter.acquire()
+print("Unlimited calls don't wait:", time.monotonic() - start < 0.1)
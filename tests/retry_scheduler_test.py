@@ -0,0 +1,40 @@
+# python -m tests.retry_scheduler_test
+
+
+import time
+from queue import Queue
+from src.infrastructure.retry_scheduler import RetryScheduler
+
+# The backoff doubles on each attempt up to the cap, with jitter in [delay / 2, delay]
+retry_scheduler = RetryScheduler(lambda item: None, base_delay=2, max_delay=60)
+for attempt in range(1, 8):
+    delay = min(60, 2 * 2 ** (attempt - 1))
+    samples = [retry_scheduler.backoff(attempt) for _ in range(1000)]
+    print(
+        f"Attempt {attempt}: {min(samples):.2f}s to {max(samples):.2f}s, "
+        f"within [{delay / 2}, {delay}]: {all(delay / 2 <= sample <= delay for sample in samples)}"
+    )
+# Items that failed together are spread out instead of retrying together
+samples = [retry_scheduler.backoff(3) for _ in range(100)]
+print("Jittered delays are spread out:", len(set(samples)) == len(samples))
+retry_scheduler.stop()
+
+# Items are released in the order they become due, not the order they were scheduled
+work_queue = Queue()
+retry_scheduler = RetryScheduler(work_queue.put, base_delay=0.1, max_delay=1)
+start = time.monotonic()
+retry_scheduler.schedule('third retry', 4)
+retry_scheduler.schedule('second retry', 2)
+retry_scheduler.schedule('first retry', 1)
+print("Pending retries:", retry_scheduler.pending_count())
+# Fresh work goes through the queue while the retries wait
+work_queue.put('fresh item')
+released = [(work_queue.get(), round(time.monotonic() - start, 2)) for _ in range(4)]
+print("Released items with their delay:", released)
+print("Released in due order:", [item for item, _ in released] == ['fresh item', 'first retry', 'second retry', 'third retry'])
+print("Pending retries:", retry_scheduler.pending_count())
+
+# Retries not yet due are dropped on stop
+retry_scheduler.schedule('late retry', 10)
+retry_scheduler.stop()
+print("Late retry released after stop:", not work_queue.empty())
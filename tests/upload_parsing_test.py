@@ -0,0 +1,21 @@
+# python -m tests.upload_parsing_test
+
+
+import gzip
+from io import BytesIO
+from src.infrastructure.upload_parser import UploadParser
+from src.infrastructure.transaction_sheet_service import TransactionSheetService
+
+# Path to your local Excel file
+file_path = './Transactions_1.xlsx'  # Replace with your actual file path
+
+# Write the same transactions as CSV, TSV and gzip compressed CSV
+df = UploadParser.read_file(file_path)
+csv_file = BytesIO(df.to_csv(index=False).encode())
+tsv_file = BytesIO(df.to_csv(index=False, sep='\t').encode())
+gzip_file = BytesIO(gzip.compress(df.to_csv(index=False).encode()))
+
+# Every file type is sniffed and read with the transactions schema
+for name, file in [('xlsx', file_path), ('csv', csv_file), ('tsv', tsv_file), ('csv.gz', gzip_file)]:
+    print(f"{name} file detected as: {UploadParser.file_type(file)}")
+    print(UploadParser.read_file(file, schema=TransactionSheetService.SCHEMA))
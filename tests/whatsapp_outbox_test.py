@@ -0,0 +1,55 @@
+# python -m tests.whatsapp_outbox_test
+
+
+import os
+import tempfile
+from src.infrastructure.whatsapp_outbox import WhatsAppOutbox
+from src.infrastructure.whatsapp_messages_queue import WhatsappMessagesQueue
+
+db_path = os.path.join(tempfile.mkdtemp(), 'outbox', 'whatsapp_outbox.db')
+
+# Queue three messages; one is sent, one fails once and one is still in flight
+outbox = WhatsAppOutbox(db_path)
+stored = outbox.enqueue_many([
+    ('573000000001', 'Mensaje 1', 'wp-1'),
+    ('573000000002', 'Mensaje 2', 'wp-2'),
+    ('573000000003', 'Mensaje 3', 'wp-3')
+])
+print("Stored messages:", stored)
+outbox.ack(stored[0][0])
+outbox.retry(stored[1][0], 1)
+# The process stops here, before the other sends are acknowledged
+outbox.close()
+
+# The next start recovers the unacknowledged messages in order, with their retry counts
+outbox = WhatsAppOutbox(db_path)
+recovered = outbox.recover()
+print("Recovered after the crash:", recovered)
+print("Sent message not recovered:", all(message[3] != 'wp-1' for message in recovered))
+print("Retry count kept:", [message[4] for message in recovered] == [1, 0])
+
+# Messages out of retries are kept but never sent again
+outbox.fail(recovered[0][0])
+print("Recovered after failing wp-2:", outbox.recover())
+print("Failed messages:", outbox.count(WhatsAppOutbox.FAILED))
+outbox.close()
+
+
+class RecordingWhatsAppService:
+    """Stands in for WhatsAppService and records the messages it is asked to send"""
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, cellphone, message):
+        self.sent.append((cellphone, message))
+        return True
+
+
+# A queue started on the outbox sends the message left pending and empties the outbox
+whatsapp_service = RecordingWhatsAppService()
+queue = WhatsappMessagesQueue(whatsapp_service, rate_per_second=0, rate_per_minute=0, outbox_path=db_path)
+queue.message_queue.join()
+print("Sent on restart:", whatsapp_service.sent)
+print("Pending after the restart:", queue.outbox.count(WhatsAppOutbox.PENDING))
+queue.stop()